@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+发现阶段微基准 - 对比HTTP通道解析首页的新旧实现
+
+  baseline  原来的实现：lxml.html 解析、每页重新解析XPath字符串、每个链接都调用 urljoin，
+            再按三种策略分别遍历链接
+  current   scys_discovery.snapshot_links_from_html + rank_links：lxml.etree 解析一次，
+            预编译选择器，一次遍历打分排序
+
+默认使用生成的大首页（热门列表、每条带作者和标签链接、侧栏）和一个热门文章不足5篇、
+需要兜底链接补足的小首页，也可以传入保存的 debug_page.html。两种实现的结果必须一致，否则报错退出。
+
+用法：
+    python3 bench_discovery.py --articles 2000 --repeat 20
+    python3 bench_discovery.py --html debug_page.html --base-url https://scys.com/
+"""
+import sys
+import time
+import argparse
+from urllib.parse import urljoin
+
+from scys_discovery import NEXT_PAGE_XPATH, rank_links, snapshot_links_from_html
+from scys_metrics import percentile
+from scrape_scys_advanced import ARTICLE_LINK_XPATH, HOT_SECTION_XPATH
+
+SELECTORS = [ARTICLE_LINK_XPATH, NEXT_PAGE_XPATH]
+
+
+def synthetic_home(articles=2000, sidebar=500):
+    """结构接近真实首页的大页面：热门区域 + 每条文章附带作者/标签链接 + 侧栏 + 分页"""
+    items = ''.join(
+        f"<li class='list-item'><div class='card'><span class='tag'>副业</span>"
+        f"<a class='post-title' href='/articles/{i}'>热门文章第{i}篇：如何用副业实现稳定的被动收入</a>"
+        f"<p>摘要内容第{i}段，介绍文章的主要观点和实践经验。</p>"
+        f"<div class='meta'><a href='/u/{i}'>作者{i}</a> <a href='/tag/{i % 20}'>标签{i % 20}</a></div>"
+        f"</div></li>"
+        for i in range(1, articles + 1)
+    )
+    side = ''.join(
+        f"<div class='widget'><a href='/s/{i}'>侧栏推荐第{i}个很长的标题文字</a></div>"
+        for i in range(1, sidebar + 1)
+    )
+    return ("<html><head><title>生财有术</title></head><body>"
+            "<header><a href='/about'>关于我们</a> <a href='/logout'>退出</a></header>"
+            f"<section class='feed'><h2>热门</h2><div class='hot-list'><ul>{items}</ul></div></section>"
+            f"<aside>{side}</aside>"
+            "<nav class='pager'><a rel='next' href='/?page=2'>下一页</a></nav>"
+            "</body></html>")
+
+
+def sparse_home(hot=2, sidebar=8):
+    """热门区域只有少量文章的首页：候选不足5篇，需要兜底链接补足"""
+    items = ''.join(
+        f"<li><a class='post-title' href='/articles/{i}'>热门文章第{i}篇：副业起步的第一步</a></li>"
+        for i in range(1, hot + 1)
+    )
+    side = ''.join(
+        f"<div class='widget'><a href='/s/{i}'>侧栏推荐第{i}个很长的标题文字</a></div>"
+        for i in range(1, sidebar + 1)
+    )
+    return ("<html><body>"
+            "<header><a href='/about'>关于我们的团队和故事</a> <a href='/login'>登录生财有术账号</a></header>"
+            f"<section class='feed'><h2>热门</h2><div class='hot-list'><ul>{items}</ul></div></section>"
+            f"<aside>{side}</aside>"
+            "</body></html>")
+
+
+def _is_hot_element(element):
+    """原来的热门祖先判断：class含hot，或直接文本/标题子元素含'热门'"""
+    if 'hot' in (element.get('class') or ''):
+        return True
+    if element.text and '热门' in element.text:
+        return True
+    for child in element:
+        if child.tail and '热门' in child.tail:
+            return True
+        if child.tag in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6') and '热门' in ''.join(child.itertext()):
+            return True
+    return False
+
+
+
+def baseline_snapshot(html, base_url, selectors, container_xpath, container_limit):
+    """原来的 snapshot_links_from_html"""
+    import lxml.html
+
+    doc = lxml.html.fromstring(html)
+    anchors = doc.xpath('//a')
+    info = {a: {'matches': [], 'sections': []} for a in anchors}
+    for index, xpath in enumerate(selectors):
+        for node in doc.xpath(xpath):
+            if node in info:
+                info[node]['matches'].append(index)
+    for index, section in enumerate(doc.xpath(container_xpath)[:container_limit]):
+        for a in section.iter('a'):
+            if index not in info[a]['sections']:
+                info[a]['sections'].append(index)
+
+    hot_cache = {}
+    links = []
+    for a in anchors:
+        hot_depth = None
+        depth = 1
+        node = a.getparent()
+        while node is not None and node.getparent() is not None:
+            if node not in hot_cache:
+                hot_cache[node] = _is_hot_element(node)
+            if hot_cache[node]:
+                hot_depth = depth
+                break
+            node = node.getparent()
+            depth += 1
+        raw_href = a.get('href') or ''
+        text = ' '.join(a.text_content().split())
+        links.append({
+            'href': urljoin(base_url, raw_href) if raw_href else '',
+            'raw_href': raw_href, 'text': text, 'text_content': text,
+            'classes': (a.get('class') or '').split(), 'hot_depth': hot_depth,
+            'matches': info[a]['matches'], 'sections': info[a]['sections'],
+        })
+    return links
+
+
+def baseline_pick(links, base_url):
+    """原来的 pick_hot_articles：三种策略依次遍历，前两种不够时由策略3补足"""
+    for section in range(3):
+        for link in links:
+            if section in link['sections'] and link['href'] and len(link['text']) > 5:
+                yield link['text'], link['href']
+    for link in links:
+        if 0 in link['matches'] and link['href'] and len(link['text']) > 5:
+            yield link['text'], link['href']
+    for link in links:
+        text = link['text_content']
+        href = link['raw_href']
+        if (href and len(text) > 10 and ('scys.com' in href or href.startswith('/')) and
+                not any(x in href.lower() for x in ['login', 'register', 'about', 'help'])):
+            yield text, href if href.startswith('http') else base_url.rstrip('/') + href
+
+
+def run_baseline(html, base_url):
+    links = baseline_snapshot(html, base_url, SELECTORS, HOT_SECTION_XPATH, 3)
+    seen = set()
+    result = []
+    for title, url in baseline_pick(links, base_url):
+        if url not in seen:
+            seen.add(url)
+            result.append((title, url))
+    return result
+
+
+def run_current(html, base_url):
+    links = snapshot_links_from_html(html, base_url, SELECTORS, HOT_SECTION_XPATH, 3)
+    return rank_links(links, base_url)
+
+
+def measure(fn, html, base_url, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(html, base_url)
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比发现阶段新旧实现的解析耗时")
+    parser.add_argument('--html', nargs='*', help="保存的首页HTML（如 debug_page.html），默认使用生成的页面")
+    parser.add_argument('--base-url', default='https://scys.com/', help="页面的基准URL")
+    parser.add_argument('--articles', type=int, default=2000, help="生成页面的热门文章数")
+    parser.add_argument('--sidebar', type=int, default=500, help="生成页面的侧栏链接数")
+    parser.add_argument('--repeat', type=int, default=20, help="每种实现的重复次数")
+    args = parser.parse_args()
+
+    if args.html:
+        pages = []
+        for path in args.html:
+            with open(path, 'r', encoding='utf-8') as f:
+                pages.append((path, f.read()))
+    else:
+        pages = [(f"synthetic({args.articles}+{args.sidebar})", synthetic_home(args.articles, args.sidebar)),
+                 ("sparse(2+8)", sparse_home())]
+
+    print(f"{'页面':<28}{'大小(KB)':>10}{'结果数':>8}{'baseline p50':>14}{'current p50':>14}{'加速':>8}")
+    for name, html in pages:
+        expected, base_times = measure(run_baseline, html, args.base_url, args.repeat)
+        actual, new_times = measure(run_current, html, args.base_url, args.repeat)
+        if actual != expected:
+            print(f"✗ {name}: 两种实现的结果不一致（baseline {len(expected)} 条，current {len(actual)} 条）")
+            sys.exit(1)
+        if name.startswith('sparse') and len(actual) < 5:
+            print(f"✗ {name}: 候选不足时兜底链接没有补足（只有 {len(actual)} 条）")
+            sys.exit(1)
+        base_p50 = percentile(base_times, 50)
+        new_p50 = percentile(new_times, 50)
+        print(f"{name[:27]:<28}{len(html.encode('utf-8')) / 1024:>10.0f}{len(actual):>8}"
+              f"{base_p50 * 1000:>12.1f}ms{new_p50 * 1000:>12.1f}ms{base_p50 / new_p50:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
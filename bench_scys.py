@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+离线基准测试 - 在本地测试站点上测量爬虫吞吐量
+
+不访问真实网站、不需要手动登录。启动 scys_fixture.FixtureSite，用生成的cookies
+驱动两个爬虫的各个阶段（无头模式）：
+
+  advanced:  find_hot_articles、save_page_as_pdf
+  basic:     get_article_content、save_to_pdf
+
+输出每个阶段的 articles/sec、p50/p95/max 延迟，以及本进程加所有浏览器子进程的峰值RSS。
+
+用法：
+    python3 bench_scys.py --articles 20 --workers 4
+    python3 bench_scys.py --only basic --no-http --output bench_result.json
+"""
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+from scys_fixture import FixtureSite
+from scys_http import HTTPFetcher
+from scys_metrics import process_tree_rss
+from scys_session import SessionValidator
+
+
+class MemorySampler:
+    """后台线程定期采样进程树RSS，记录峰值"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, process_tree_rss())
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.peak = max(self.peak, process_tree_rss())
+        return self.peak
+
+
+def configure(scraper, site, cookies_file, use_http, resource_policy='default'):
+    """把爬虫指向本地测试站点，并关闭限速和增量清单（输出目录在构造时传入）"""
+    scraper.base_url = site.url
+    scraper.cookies_file = cookies_file
+    scraper.use_http = use_http
+    scraper.incremental = False
+    scraper.limiter = None
+    scraper.resource_policy = resource_policy
+    scraper.http = HTTPFetcher(site.url, cookies_file)
+    scraper.session_check = SessionValidator(cookies_file, ttl=0)
+    return scraper
+
+
+def fixture_articles(site):
+    return [
+        {'title': site.title(i), 'url': f"{site.url}articles/{i}", 'index': i}
+        for i in range(1, site.articles + 1)
+    ]
+
+
+def network_totals(report):
+    """汇总每篇文章的接收字节数和被拦截的请求数（与 --resource-policy off 对比得出节省量）"""
+    received = 0
+    blocked = {}
+    for entry in report.summary()['articles'].values():
+        received += entry.get('bytes_received', 0) or 0
+        for resource_type, count in (entry.get('blocked') or {}).items():
+            blocked[resource_type] = blocked.get(resource_type, 0) + count
+    return {'bytes_received': received, 'requests_blocked': sum(blocked.values()), 'blocked': blocked}
+
+
+def throughput(count, seconds):
+    return round(count / seconds, 3) if seconds > 0 else 0.0
+
+
+def bench_advanced(site, cookies_file, workdir, args):
+    """改进版：发现 + 浏览器打印PDF"""
+    from scrape_scys_advanced import SCYSScraperAdvanced
+
+    output_dir = os.path.join(workdir, 'advanced')
+    os.makedirs(output_dir, exist_ok=True)
+    scraper = configure(SCYSScraperAdvanced(output_dir=output_dir), site, cookies_file, args.http,
+                        args.resource_policy)
+    scraper.workers = args.workers
+    scraper.max_articles = args.articles
+    scraper.write_behind = args.write_behind
+    result = {}
+    try:
+        start = time.perf_counter()
+        scraper.setup_driver(headless=True)
+        scraper.load_cookies()
+        result['startup_seconds'] = round(time.perf_counter() - start, 3)
+
+        start = time.perf_counter()
+        with scraper.report.span('discovery'):
+            found = scraper.find_hot_articles()
+        result['find_hot_articles'] = {
+            'seconds': round(time.perf_counter() - start, 3),
+            'found': len(found),
+        }
+
+        articles = fixture_articles(site)
+        scraper.start_writer()
+        start = time.perf_counter()
+        if args.workers > 1:
+            rendered = scraper.save_pages_parallel(articles, len(articles))
+        else:
+            rendered = [(article,) + scraper.render_article(article, len(articles)) for article in articles]
+        if scraper.writer:
+            # 计入最后几个文件的落盘时间
+            scraper.writer.flush()
+        elapsed = time.perf_counter() - start
+        ok = sum(1 for _, path, _ in rendered if path)
+        result['save_page_as_pdf'] = {
+            'seconds': round(elapsed, 3),
+            'ok': ok,
+            'articles_per_sec': throughput(ok, elapsed),
+        }
+        result['network'] = network_totals(scraper.report)
+        result['marks'] = scraper.report.summary()['marks']
+        result['stages'] = scraper.report.summary()['stages']
+    finally:
+        if scraper.writer:
+            scraper.writer.close()
+        scraper.close()
+        scraper.http.close()
+    return result
+
+
+def bench_basic(site, cookies_file, workdir, args):
+    """基础版：正文获取 + fpdf生成PDF"""
+    from scrape_scys import SCYSScraper
+
+    output_dir = os.path.join(workdir, 'basic')
+    os.makedirs(output_dir, exist_ok=True)
+    scraper = configure(SCYSScraper(output_dir=output_dir), site, cookies_file, args.http,
+                        args.resource_policy)
+    scraper.headless = True
+    scraper.write_behind = args.write_behind
+    result = {}
+    try:
+        articles = fixture_articles(site)
+
+        contents = []
+        start = time.perf_counter()
+        for article in articles:
+            with scraper.report.span('fetch', article=article['url']):
+                contents.append(scraper.get_article_content(article['url']))
+        elapsed = time.perf_counter() - start
+        ok = sum(1 for data in contents if data)
+        result['get_article_content'] = {
+            'seconds': round(elapsed, 3),
+            'ok': ok,
+            'articles_per_sec': throughput(ok, elapsed),
+        }
+
+        scraper.start_writer()
+        start = time.perf_counter()
+        saved = 0
+        for article, data in zip(articles, contents):
+            if not data:
+                continue
+            with scraper.report.span('pdf_build', article=article['url']):
+                if scraper.save_to_pdf(data, f"{article['index']:02d}_bench.pdf"):
+                    saved += 1
+        if scraper.writer:
+            scraper.writer.flush()
+            saved -= len(scraper.writer.errors)
+        elapsed = time.perf_counter() - start
+        result['save_to_pdf'] = {
+            'seconds': round(elapsed, 3),
+            'ok': saved,
+            'articles_per_sec': throughput(saved, elapsed),
+        }
+        result['stages'] = scraper.report.summary()['stages']
+    finally:
+        if scraper.writer:
+            scraper.writer.close()
+        if scraper.driver:
+            scraper.driver.quit()
+        scraper.http.close()
+    return result
+
+
+def print_summary(results):
+    print("\n" + "=" * 70)
+    print("  基准测试结果")
+    print("=" * 70)
+    for name in ('advanced', 'basic'):
+        if name not in results:
+            continue
+        print(f"\n[{name}]")
+        for key, value in results[name].items():
+            if key == 'stages':
+                continue
+            print(f"  {key}: {value}")
+        stages = results[name].get('stages', {})
+        if stages:
+            print(f"  {'阶段':<16}{'次数':>6}{'p50(s)':>10}{'p95(s)':>10}{'max(s)':>10}")
+            for stage, stat in stages.items():
+                print(f"  {stage:<16}{stat['count']:>6}{stat['p50']:>10}{stat['p95']:>10}{stat['max']:>10}")
+    print(f"\n峰值RSS（含浏览器子进程）: {results['peak_rss_mb']} MB")
+    print(f"测试站点请求数: {results['site_requests']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="在本地测试站点上运行爬虫基准测试")
+    parser.add_argument('--articles', type=int, default=20, help="文章数量")
+    parser.add_argument('--paragraphs', type=int, default=30, help="每篇文章的段落数")
+    parser.add_argument('--images', type=int, default=4, help="每篇文章的图片数")
+    parser.add_argument('--image-size', type=int, default=128, help="图片边长（像素）")
+    parser.add_argument('--latency', type=float, default=0.0, help="每个请求的模拟延迟（秒）")
+    parser.add_argument('--page-size', type=int, default=20, help="首页每页的文章数（超出部分分页）")
+    parser.add_argument('--asset-size', type=int, default=0,
+                        help="文章页额外引用的字体/统计脚本/视频的字节数（测试资源拦截）")
+    parser.add_argument('--resource-policy', default='default', choices=['off', 'default', 'images'],
+                        help="浏览器资源拦截策略")
+    parser.add_argument('--workers', type=int, default=1, help="改进版的并行浏览器数量")
+    parser.add_argument('--only', choices=['advanced', 'basic'], help="只测试一个版本")
+    parser.add_argument('--no-http', dest='http', action='store_false', help="禁用HTTP快速通道")
+    parser.add_argument('--no-write-behind', dest='write_behind', action='store_false',
+                        help="在渲染线程中直接写盘（对比后台写盘线程）")
+    parser.add_argument('--output', help="把结果写入JSON文件")
+    parser.add_argument('--keep', action='store_true', help="保留生成的PDF（默认删除临时目录）")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='scys_bench_')
+    site = FixtureSite(
+        articles=args.articles, paragraphs=args.paragraphs, images=args.images,
+        image_size=args.image_size, latency=args.latency, page_size=args.page_size,
+        asset_size=args.asset_size
+    ).start()
+    cookies_file = site.write_cookies(os.path.join(workdir, 'cookies.json'))
+    print(f"测试站点: {site.url}  工作目录: {workdir}")
+
+    sampler = MemorySampler().start()
+    results = {'config': vars(args)}
+    try:
+        if args.only in (None, 'advanced'):
+            results['advanced'] = bench_advanced(site, cookies_file, workdir, args)
+        if args.only in (None, 'basic'):
+            results['basic'] = bench_basic(site, cookies_file, workdir, args)
+    finally:
+        results['peak_rss_mb'] = round(sampler.stop() / 1024 / 1024, 1)
+        results['site_requests'] = site.requests
+        site.stop()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_summary(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
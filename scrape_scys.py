@@ -1,109 +1,194 @@
 #!/usr/bin/env python3
 """
-生财有术网站爬虫 - 爬取热门模块前5条内容并保存为PDF
+生财有术网站爬虫 - 爬取热门模块的文章（默认前5条）并保存为PDF
 """
 import os
 import json
-import time
-import base64
 import re
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from fpdf import FPDF
-import requests
-from bs4 import BeautifulSoup
+from scys_ready import PageReadiness, enable_network_tracking
+from scys_lazy import resolve_lazy_content
+from scys_lifecycle import MB, BrowserLifecycle, scratch_tab
+from scys_blocking import ResourcePolicy
+from scys_export import WriteBehind, print_to_pdf
+from scys_discovery import iter_browser_pages, iter_html_pages
+from scys_manifest import canonical_url
+from scys_http import HTTPFetcher, CONTENT_XPATHS
+from scys_session import SessionValidator, dom_logged_in, inject_cookies, load_cookie_file
+from scys_ratelimit import AdaptiveRateLimiter, limited
+from scys_metrics import RunReport, collect_page_metrics
+from scys_assets import AssetStore
+from scys_search import SearchIndex
+from scys_driver import chrome_service
+
+# selenium、fpdf 等较重的依赖在用到时才导入，只走HTTP通道时不会加载
+
+# 文本PDF相关的类和函数在 scys_pdf 中，按需导入
+_PDF_EXPORTS = ('SCYSPDF', 'FONT_PATHS', 'write_text_pdf')
+
+
+def __getattr__(name):
+    """兼容 from scrape_scys import SCYSPDF，首次访问时才导入fpdf"""
+    if name in _PDF_EXPORTS:
+        import scys_pdf
+        return getattr(scys_pdf, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-class SCYSPDF(FPDF):
-    """自定义PDF类，支持中文"""
-    def __init__(self):
-        super().__init__()
-        self.add_page()
-        # 添加支持中文的字体
-        self.font_loaded = False
-        font_paths = [
-            '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
-            '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc',
-            '/usr/share/fonts/truetype/arphic/uming.ttc',
-            '/System/Library/Fonts/PingFang.ttc',  # macOS
-        ]
-        for font_path in font_paths:
-            try:
-                if os.path.exists(font_path):
-                    self.add_font('Chinese', '', font_path, uni=True)
-                    self.set_font('Chinese', '', 12)
-                    self.font_loaded = True
-                    break
-            except Exception as e:
-                continue
-        
-        if not self.font_loaded:
-            print("警告：无法加载中文字体，PDF可能无法正确显示中文")
-            try:
-                self.set_font('Arial', '', 12)
-            except:
-                pass
 
 class SCYSScraper:
-    def __init__(self):
+    def __init__(self, output_dir="scys_pdfs"):
         self.base_url = "https://scys.com/"
         self.cookies_file = "scys_cookies.json"
-        self.output_dir = "scys_pdfs"
+        self.output_dir = output_dir  # 构造时即创建，需要其他目录时通过参数传入
+        self.page_timeout = 15  # 每个页面等待加载完成的超时预算（秒）
+        self.headless = False  # 按需启动浏览器时是否使用无头模式
+        self.interactive = True  # 登录失效时是否提示手动登录；无人值守运行（如cron）时设为False
+        self.max_rps = 1.0  # 每秒最多请求数（浏览器和HTTP共用），实际速率随服务端状态自适应
+        self.max_concurrency = 4  # 同时等待主文档响应的最大请求数
+        self.use_http = True  # 列表和正文优先用HTTP直接请求，浏览器只在需要时启动
+        self.session_ttl = 600  # 登录校验结果的缓存时间（秒），期间启动不再探测
+        self.resource_policy = 'default'  # 资源拦截策略：off / default（拦截统计追踪、字体、视频）/ images（只保留图片）
+        self.extra_blocklist = []  # 额外拦截的URL规则
+        self.max_articles = 5  # 最多爬取多少篇热门文章
+        self.max_pages = 10  # 最多沿"下一页"链接翻多少页
+        self.max_scrolls = 10  # 浏览器获取列表时每页最多向下滚动加载几次
+        self.pdf_workers = os.cpu_count() or 1  # 并行排版PDF的进程数，1表示在主进程中顺序生成
+        self.offline_assets = True  # HTML归档中的图片下载到本地资源库（scys_pdfs/assets），重新渲染不再联网
+        self.asset_workers = 8  # 并发下载图片的连接数
+        self.write_behind = True  # PDF由后台线程写盘，抓取下一篇与写入上一篇重叠进行
+        self.write_buffer_mb = 64  # 等待写盘的数据上限（MB），超过时主线程等待写线程
+        self.search_index = True  # 文章正文写入本地全文索引（search.sqlite3），用 scys_search.py 按关键词查找
+        self.recycle_tab_pages = 20  # 同一个标签页导航多少次后换新标签页（旧的渲染进程随之退出），0表示不换
+        self.recycle_pages = 200  # 浏览器加载多少个页面后重启，0表示不限制
+        self.recycle_rss_mb = 1500  # 浏览器进程树RSS超过该值（MB）时重启，0表示不限制
         self.driver = None
+        self.readiness = None
+        self.discovery_source = None  # 最近一次获取列表使用的通道：'http' 或 'browser'
+        self.assets = None
+        self.writer = None
+        self.index = None
+        self.lifecycle = BrowserLifecycle(on_new_tab=lambda: self.apply_resource_policy(announce=False))
+        self.limiter = AdaptiveRateLimiter(max_rps=self.max_rps, max_concurrency=self.max_concurrency)
+        self.http = HTTPFetcher(self.base_url, self.cookies_file, limiter=self.limiter)
+        self.session_check = SessionValidator(self.cookies_file, ttl=self.session_ttl)
+        self.report = RunReport('basic')
         
         # 创建输出目录
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
     
-    def setup_driver(self):
+    def setup_driver(self, headless=False):
         """设置Chrome浏览器"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
         chrome_options = Options()
-        # 不使用无头模式，方便用户手动登录
-        # chrome_options.add_argument('--headless')
+        # 默认不使用无头模式，方便用户手动登录
+        if headless:
+            chrome_options.add_argument('--headless=new')
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--window-size=1920,1080')
         chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        # 记录CDP网络事件，用于判断网络空闲
+        enable_network_tracking(chrome_options)
+        # driver.get 在主文档解析完(DOMContentLoaded)就返回，图片等子资源由 PageReadiness 等待
+        chrome_options.page_load_strategy = 'eager'
         
         try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            # chromedriver路径按Chrome版本缓存，命中时不联网
+            self.driver = webdriver.Chrome(service=chrome_service(), options=chrome_options)
         except Exception as e:
             print(f"Chrome WebDriver设置失败: {e}")
             print("尝试使用本地chromedriver...")
             self.driver = webdriver.Chrome(options=chrome_options)
+        
+        self.readiness = PageReadiness(self.driver, timeout=self.page_timeout)
+        self.apply_resource_policy()
+        self.lifecycle.tab_pages = self.recycle_tab_pages
+        self.lifecycle.max_pages = self.recycle_pages
+        self.lifecycle.ceiling_mb = self.recycle_rss_mb
+        self.lifecycle.attach(self.driver)
+        self.report.mark('driver_ready')
+    
+    def apply_resource_policy(self, announce=True):
+        """在浏览器上启用资源拦截，失败时不拦截继续运行（拦截规则按标签页生效，换标签页后要重新设置）"""
+        try:
+            policy = ResourcePolicy.from_name(self.resource_policy, self.extra_blocklist)
+            if policy.apply(self.driver) and announce:
+                print(f"已启用资源拦截（{self.resource_policy}）: {policy.describe()}")
+        except Exception as e:
+            print(f"启用资源拦截失败，将加载全部资源: {e}")
+    
+    def ensure_driver(self):
+        """需要浏览器时才启动Chrome并恢复登录状态"""
+        if self.driver:
+            return self.driver
+        
+        print("初始化浏览器...")
+        with self.report.span('driver_startup'):
+            self.setup_driver(headless=self.headless)
+        
+        # 尝试加载已保存的cookies
+        with self.report.span('cookie_load'):
+            cookies_loaded = self.load_cookies()
+        
+        if not cookies_loaded:
+            # 需要手动登录
+            self.manual_login()
+        else:
+            print("已加载保存的登录状态")
+            if self.http.logged_in is False:
+                # HTTP请求已被重定向到登录页，缓存的校验结果不可信
+                self.session_check.invalidate()
+            # 检查登录状态：本地过期检查和缓存都无法判断时才打开首页
+            with self.report.span('login_check'):
+                logged_in = self.session_check.validate(self.check_login_status)
+            if not logged_in:
+                print("登录状态已失效，需要重新登录")
+                self.manual_login()
+        return self.driver
+    
+    def open_page(self, url):
+        """打开页面并等待真正加载完成，加载结果反馈给限速器"""
+        self.lifecycle.before_navigation()
+        # 限速名额只覆盖服务端返回主文档这一段；之后等待子资源和DOM静默是浏览器本地的事，
+        # 不占名额，就绪超时也不算服务端变慢
+        with limited(self.limiter) as slot:
+            self.readiness.reset()
+            self.report.mark('first_navigation')
+            self.driver.get(url)
+            slot.report(status=self.readiness.document_response(), url=self.driver.current_url)
+        return self.readiness.wait()
     
     def load_cookies(self):
-        """加载已保存的cookies"""
-        if os.path.exists(self.cookies_file):
-            try:
-                with open(self.cookies_file, 'r') as f:
-                    cookies = json.load(f)
-                
-                # 先访问网站主页
-                self.driver.get(self.base_url)
-                time.sleep(2)
-                
-                # 添加cookies
-                for cookie in cookies:
-                    try:
-                        self.driver.add_cookie(cookie)
-                    except Exception as e:
-                        print(f"添加cookie失败: {e}")
-                
-                # 刷新页面
-                self.driver.refresh()
-                time.sleep(2)
-                return True
-            except Exception as e:
-                print(f"加载cookies失败: {e}")
-                return False
-        return False
+        """加载已保存的cookies，优先在导航之前通过CDP写入"""
+        cookies = load_cookie_file(self.cookies_file)
+        if not cookies:
+            return False
+        if inject_cookies(self.driver, cookies, self.base_url):
+            return True
+        
+        try:
+            # 回退：先访问网站主页（只需进入同一域名即可写入cookie）
+            self.report.mark('first_navigation')
+            self.driver.get(self.base_url)
+            
+            # 添加cookies
+            for cookie in cookies:
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception as e:
+                    print(f"添加cookie失败: {e}")
+            
+            # 刷新页面
+            self.readiness.reset()
+            self.driver.refresh()
+            self.readiness.wait()
+            return True
+        except Exception as e:
+            print(f"加载cookies失败: {e}")
+            return False
     
     def save_cookies(self):
         """保存cookies"""
@@ -112,105 +197,62 @@ class SCYSScraper:
             with open(self.cookies_file, 'w') as f:
                 json.dump(cookies, f)
             print(f"Cookies已保存到 {self.cookies_file}")
+            self.http.load_cookies()
         except Exception as e:
             print(f"保存cookies失败: {e}")
     
     def manual_login(self):
         """提示用户手动登录"""
+        if not self.interactive:
+            raise RuntimeError("登录状态已失效，无人值守模式无法手动登录，请以交互方式重新运行一次完成登录")
+        
         print("\n" + "="*60)
         print("请在打开的浏览器窗口中手动登录生财有术网站")
         print("登录成功后，请在终端中按回车键继续...")
         print("="*60 + "\n")
         
+        # 登录页可能依赖被拦截的第三方脚本，登录期间暂停拦截
+        try:
+            ResourcePolicy.clear(self.driver)
+        except Exception:
+            pass
         self.driver.get(self.base_url)
         input("登录完成后请按回车键继续...")
+        self.apply_resource_policy()
         
         # 保存cookies
         self.save_cookies()
+        self.session_check.record(True)
         print("登录状态已保存！")
     
     def check_login_status(self):
-        """检查是否已登录"""
+        """打开首页，用一次DOM查询检查是否已登录（根据实际网站调整 LOGIN_STATE_JS）"""
         try:
-            # 检查页面是否有登录后的元素（根据实际网站调整）
-            # 这里需要根据实际网站结构来判断
-            WebDriverWait(self.driver, 5).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            # 简单检查：如果页面中没有登录按钮，则认为已登录
-            page_source = self.driver.page_source
-            if "登录" in page_source and "退出" not in page_source:
-                return False
-            return True
-        except:
+            self.open_page(self.base_url)
+            return dom_logged_in(self.driver)
+        except Exception:
             return False
     
+    # 尝试找到热门模块（需要根据实际网站结构调整选择器）
+    # 这里提供几种常见的选择器，按优先级排列
+    HOT_SELECTORS = [
+        "//div[contains(@class, 'hot')]//a[contains(@href, '/')]",
+        "//div[contains(text(), '热门')]/..//a",
+        "//section[contains(@class, 'hot')]//a",
+        "//div[@class='list-item']//a",
+        "//article//a[@href]",
+        "//a[contains(@class, 'title')]"
+    ]
+    
     def get_hot_articles(self):
-        """获取热门模块的前5条文章链接和标题"""
+        """获取热门模块的文章链接和标题（最多 max_articles 篇）"""
         print("正在获取热门文章列表...")
         
         try:
-            # 访问网站首页
-            self.driver.get(self.base_url)
-            time.sleep(3)
-            
-            # 尝试找到热门模块（需要根据实际网站结构调整选择器）
-            # 这里提供几种常见的选择器尝试
-            articles = []
-            
-            # 尝试不同的选择器
-            selectors = [
-                "//div[contains(@class, 'hot')]//a[contains(@href, '/')]",
-                "//div[contains(text(), '热门')]/..//a",
-                "//section[contains(@class, 'hot')]//a",
-                "//div[@class='list-item']//a",
-                "//article//a[@href]",
-                "//a[contains(@class, 'title')]"
-            ]
-            
-            for selector in selectors:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    if elements and len(elements) >= 5:
-                        for element in elements[:5]:
-                            try:
-                                title = element.text.strip()
-                                url = element.get_attribute('href')
-                                if title and url and url.startswith('http'):
-                                    articles.append({'title': title, 'url': url})
-                                    if len(articles) >= 5:
-                                        break
-                            except:
-                                continue
-                    if len(articles) >= 5:
-                        break
-                except:
-                    continue
-            
+            articles = list(self.iter_hot_articles())
             if not articles:
-                # 如果没有找到，打印页面源码帮助调试
-                print("未能找到热门文章，正在保存页面源码用于调试...")
-                with open("debug_page.html", "w", encoding="utf-8") as f:
-                    f.write(self.driver.page_source)
-                print("页面源码已保存到 debug_page.html")
-                
-                # 尝试获取所有链接
-                print("尝试获取所有文章链接...")
-                all_links = self.driver.find_elements(By.TAG_NAME, "a")
-                for link in all_links[:10]:
-                    try:
-                        title = link.text.strip()
-                        url = link.get_attribute('href')
-                        if title and url and len(title) > 5:
-                            print(f"找到链接: {title[:50]} - {url}")
-                            articles.append({'title': title, 'url': url})
-                            if len(articles) >= 5:
-                                break
-                    except:
-                        continue
-            
-            return articles[:5]
+                self.save_debug_page()
+            return articles
         
         except Exception as e:
             print(f"获取热门文章失败: {e}")
@@ -218,22 +260,129 @@ class SCYSScraper:
             traceback.print_exc()
             return []
     
+    def iter_hot_articles(self):
+        """流式获取热门文章：沿分页和滚动加载逐批产出 {'title', 'url', 'index'}
+        
+        第一批链接决定使用哪个选择器，之后的批次沿用同一个；按规范化URL去重
+        """
+        selectors = self.HOT_SELECTORS
+        pages = None
+        first = None
+        
+        # 优先直接请求首页HTML，不需要浏览器
+        if self.driver is None and self.use_http:
+            pages = iter_html_pages(self.http.fetch_html, self.base_url, selectors,
+                                    max_pages=self.max_pages)
+            first = next(pages, None)
+            if not first or self.pick_selector(first, selectors) is None:
+                print("HTTP请求未找到文章，改用浏览器获取...")
+                pages.close()
+                pages = first = None
+        
+        if pages is None:
+            self.ensure_driver()
+            self.discovery_source = 'browser'
+            # 一次JS调用取回所有链接及其命中的选择器，避免逐个元素往返
+            pages = iter_browser_pages(
+                self.driver, self.open_page, self.base_url, selectors,
+                max_pages=self.max_pages, max_scrolls=self.max_scrolls,
+                settle=self.settle_page
+            )
+            first = next(pages, None)
+        else:
+            self.discovery_source = 'http'
+        
+        if not first:
+            return
+        index = self.pick_selector(first, selectors)
+        if index is None:
+            # 所有选择器都不满足时，尝试获取所有文章链接
+            print("尝试获取所有文章链接...")
+        
+        # 浏览器获取列表时，文章内容也要用同一个浏览器，先完成列表获取再产出
+        buffered = self.discovery_source == 'browser'
+        found = []
+        seen = set()
+        links = first
+        while links is not None:
+            for link in links:
+                title = link['text']
+                url = link['href']
+                if not (title and url.startswith('http')):
+                    continue
+                if index is None and len(title) <= 5 or index is not None and index not in link['matches']:
+                    continue
+                key = canonical_url(url)
+                if key in seen:
+                    continue
+                seen.add(key)
+                article = {'title': title, 'url': url, 'index': len(seen)}
+                if buffered:
+                    found.append(article)
+                else:
+                    yield article
+                if len(seen) >= self.max_articles:
+                    pages.close()
+                    yield from found
+                    return
+            links = next(pages, None)
+        yield from found
+    
+    def save_debug_page(self):
+        """打印页面源码帮助调试"""
+        print("未能找到热门文章，正在保存页面源码用于调试...")
+        try:
+            self.ensure_driver()
+            with open("debug_page.html", "w", encoding="utf-8") as f:
+                f.write(self.driver.page_source)
+            print("页面源码已保存到 debug_page.html")
+        except Exception as e:
+            print(f"保存页面源码失败: {e}")
+    
+    def pick_selector(self, links, selectors):
+        """返回第一个命中足够多链接的选择器下标，都不满足时返回None"""
+        need = min(5, self.max_articles)
+        for index in range(len(selectors)):
+            matched = [link for link in links
+                       if index in link['matches'] and link['text'] and link['href'].startswith('http')]
+            if len(matched) >= need:
+                return index
+        return None
+    
+    def settle_page(self):
+        """滚动加载后等待新内容就绪"""
+        self.readiness.reset()
+        self.readiness.wait()
+    
     def get_article_content(self, url):
         """获取文章完整内容"""
         try:
             print(f"正在获取文章内容: {url}")
-            self.driver.get(url)
-            time.sleep(3)
+            
+            # 优先HTTP直接获取，服务端HTML不完整时回退到浏览器
+            if self.use_http:
+                content_data = self.http.get_article_content(url)
+                if content_data:
+                    self.report.annotate(url, source='http')
+                    return content_data
+                print("HTTP获取的内容不完整，改用浏览器获取...")
+            
+            from selenium.webdriver.common.by import By
+            
+            self.ensure_driver()
+            self.open_page(url)
+            self.report.annotate(
+                url,
+                source='browser',
+                status=self.readiness.document_status,
+                requests=self.readiness.requests,
+                bytes_received=self.readiness.bytes_received,
+                blocked=dict(self.readiness.blocked),
+                metrics=collect_page_metrics(self.driver)
+            )
             
             # 尝试获取文章内容（需要根据实际网站结构调整）
-            content_selectors = [
-                "//article",
-                "//div[contains(@class, 'content')]",
-                "//div[contains(@class, 'article')]",
-                "//div[contains(@class, 'post-content')]",
-                "//main",
-                "//body"
-            ]
+            content_selectors = CONTENT_XPATHS
             
             content_element = None
             for selector in content_selectors:
@@ -260,7 +409,8 @@ class SCYSScraper:
                 return {
                     'title': title,
                     'content': content,
-                    'html': content_element.get_attribute('innerHTML')
+                    'html': content_element.get_attribute('innerHTML'),
+                    'url': self.driver.current_url
                 }
             else:
                 print("未能找到文章内容元素")
@@ -276,33 +426,16 @@ class SCYSScraper:
         """将文章内容保存为PDF"""
         try:
             print(f"正在保存PDF: {filename}")
+            from scys_pdf import render_text_pdf, write_text_pdf
             
-            pdf = SCYSPDF()
-            
-            # 添加标题
-            pdf.set_font_size(16)
-            title = article_data['title']
-            pdf.multi_cell(0, 10, title)
-            pdf.ln(5)
-            
-            # 添加内容
-            pdf.set_font_size(12)
-            content = article_data['content']
-            
-            # 处理内容，避免特殊字符问题
-            lines = content.split('\n')
-            for line in lines:
-                if line.strip():
-                    try:
-                        pdf.multi_cell(0, 8, line)
-                    except Exception as e:
-                        # 如果某行有问题，跳过
-                        print(f"警告：跳过有问题的行: {e}")
-                        continue
-            
-            # 保存PDF
             output_path = os.path.join(self.output_dir, filename)
-            pdf.output(output_path)
+            if self.writer:
+                # 排版在主线程，写盘交给写线程，结果在运行结束时汇总
+                self.writer.write_bytes(output_path, render_text_pdf(article_data),
+                                        tag=article_data.get('url'))
+                print(f"PDF已排版，后台写入: {output_path}")
+                return True
+            write_text_pdf(article_data, output_path)
             print(f"PDF已保存: {output_path}")
             return True
         
@@ -310,22 +443,33 @@ class SCYSScraper:
             print(f"保存PDF失败: {e}")
             import traceback
             traceback.print_exc()
+            return self.save_with_browser(article_data, filename)
+    
+    def save_with_browser(self, article_data, filename):
+        """备用方法：保存为HTML，再用浏览器打印为PDF"""
+        try:
+            html_filename = filename.replace('.pdf', '.html')
+            html_path = os.path.join(self.output_dir, html_filename)
+            body_html = article_data['html']
+            if self.offline_assets:
+                with self.report.span('asset_fetch', article=article_data.get('url')):
+                    body_html = self.localize_assets(article_data)
+            with open(html_path, 'w', encoding='utf-8') as f:
+                f.write(f"<html><head><meta charset='utf-8'><title>{article_data['title']}</title></head>")
+                f.write(f"<body><h1>{article_data['title']}</h1>")
+                f.write(f"<div>{body_html}</div></body></html>")
+            print(f"已保存为HTML格式: {html_path}")
             
-            # 尝试使用备用方法：保存为HTML
-            try:
-                html_filename = filename.replace('.pdf', '.html')
-                html_path = os.path.join(self.output_dir, html_filename)
-                with open(html_path, 'w', encoding='utf-8') as f:
-                    f.write(f"<html><head><meta charset='utf-8'><title>{article_data['title']}</title></head>")
-                    f.write(f"<body><h1>{article_data['title']}</h1>")
-                    f.write(f"<div>{article_data['html']}</div></body></html>")
-                print(f"已保存为HTML格式: {html_path}")
-                
-                # 尝试使用浏览器打印功能保存为PDF
-                self.driver.execute_script("window.open('');")
-                self.driver.switch_to.window(self.driver.window_handles[-1])
+            # 尝试使用浏览器打印功能保存为PDF
+            self.ensure_driver()
+            # 在临时标签页中打印，出错时也会关闭，不会留下越来越多的窗口
+            with scratch_tab(self.driver):
+                # 本地文件不经过限速器
+                self.readiness.reset()
                 self.driver.get(f"file://{os.path.abspath(html_path)}")
-                time.sleep(2)
+                self.readiness.wait()
+                # 没有本地化的懒加载图片（下载失败的）打印前也要加载出来
+                resolve_lazy_content(self.driver, timeout=self.page_timeout)
                 
                 # 使用打印功能保存PDF
                 pdf_settings = {
@@ -336,72 +480,195 @@ class SCYSScraper:
                 }
                 
                 output_path = os.path.join(self.output_dir, filename)
-                result = self.driver.execute_cdp_cmd("Page.printToPDF", pdf_settings)
-                
-                with open(output_path, 'wb') as f:
-                    import base64
-                    f.write(base64.b64decode(result['data']))
-                
-                print(f"通过浏览器打印已保存PDF: {output_path}")
-                self.driver.close()
-                self.driver.switch_to.window(self.driver.window_handles[0])
-                
+                print_to_pdf(self.driver, output_path, pdf_settings,
+                             writer=self.writer, tag=article_data.get('url'))
+                self.lifecycle.sample()
+            
+            print(f"通过浏览器打印已保存PDF: {output_path}")
+            return True
+        except Exception as e2:
+            print(f"备用方法也失败: {e2}")
+            return False
+    
+    def index_article(self, article, content_data, output_path):
+        """把抓取到的正文写入全文索引，失败时只提示，不影响生成PDF"""
+        if not self.index:
+            return
+        try:
+            with self.report.span('search_index', article=article['url']):
+                self.index.add(
+                    article['url'], content_data.get('title') or article['title'],
+                    content_data.get('content') or '', output_path,
+                    meta={'list_title': article['title'], 'index': article['index']}
+                )
+        except Exception as e:
+            print(f"写入全文索引失败: {e}")
+    
+    def record_memory(self, url):
+        """采样浏览器内存，把本篇文章处理期间的峰值写入运行报告"""
+        if not self.driver:
+            return
+        self.lifecycle.sample()
+        peak = self.lifecycle.article_peak()
+        if peak:
+            self.report.annotate(url, rss_peak_mb=round(peak / MB, 1), rss_source=self.lifecycle.source)
+    
+    def recycle_driver(self):
+        """浏览器加载的页面数或内存超过上限时关闭它，下次需要时由 ensure_driver 重新启动并恢复登录状态"""
+        reason = self.lifecycle.restart_reason()
+        if not reason:
+            return
+        print(f"♻ 回收浏览器（{reason}）")
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.driver = None
+        self.lifecycle.detach()
+    
+    def localize_assets(self, article_data):
+        """把正文中的图片换成本地资源库中的副本，返回改写后的HTML；下载失败的保留原地址"""
+        try:
+            if self.assets is None:
+                self.assets = AssetStore(os.path.join(self.output_dir, 'assets'), self.http,
+                                         workers=self.asset_workers)
+            html, stats = self.assets.localize_html(
+                article_data['html'], article_data.get('url') or self.base_url, self.output_dir
+            )
+        except Exception as e:
+            print(f"本地化图片失败，使用原地址: {e}")
+            return article_data['html']
+        if stats['assets']:
+            print(f"图片: {stats['downloaded']} 个新下载（{stats['bytes'] / 1024:.0f} KB），"
+                  f"{stats['cached']} 个使用本地缓存，{stats['failed']} 个失败")
+        if article_data.get('url'):
+            self.report.annotate(article_data['url'], assets=stats)
+        return html
+    
+    def start_writer(self):
+        """启动后台写盘线程（write_behind 关闭时在主线程中直接写盘）"""
+        if self.write_behind and self.writer is None:
+            self.writer = WriteBehind(self.write_buffer_mb * 1024 * 1024,
+                                      on_complete=self.on_file_written).start()
+        return self.writer
+    
+    def on_file_written(self, pending):
+        """写线程完成一个文件后调用，写盘耗时和错误记入运行报告"""
+        if pending.tag:
+            self.report.add('disk_write', pending.seconds, article=pending.tag)
+            if pending.error:
+                self.report.annotate(pending.tag, write_error=pending.error)
+    
+    def submit_pdf(self, pool, article_data, filename, url):
+        """把排版任务交给进程池，主线程继续抓取下一篇"""
+        from scys_pdf import build_pdf_job
+        
+        future = pool.submit(build_pdf_job, article_data)
+        return future, article_data, filename, url
+    
+    def collect_pdf(self, job):
+        """等待一个排版任务完成并写盘（写线程或原子重命名），失败时在主进程用浏览器打印兜底"""
+        from scys_pdf import write_pdf_bytes
+        
+        future, article_data, filename, url = job
+        try:
+            data, seconds, error = future.result()
+        except Exception as e:
+            # 工作进程异常退出（BrokenProcessPool等）
+            data, seconds, error = None, 0.0, f"{type(e).__name__}: {e}"
+        self.report.add('pdf_build', seconds, article=url)
+        
+        output_path = os.path.join(self.output_dir, filename)
+        if data is not None:
+            if self.writer:
+                self.writer.write_bytes(output_path, data, tag=url)
+                print(f"PDF已排版，后台写入: {output_path}")
                 return True
-            except Exception as e2:
-                print(f"备用方法也失败: {e2}")
-                return False
+            try:
+                write_pdf_bytes(data, output_path)
+                print(f"PDF已保存: {output_path}")
+                return True
+            except OSError as e:
+                error = f"{type(e).__name__}: {e}"
+        print(f"保存PDF失败: {filename} ({error})")
+        with self.report.span('pdf_fallback', article=url):
+            return self.save_with_browser(article_data, filename)
     
     def run(self):
         """运行爬虫"""
         try:
-            print("初始化浏览器...")
-            self.setup_driver()
-            
-            # 尝试加载已保存的cookies
-            cookies_loaded = self.load_cookies()
-            
-            if not cookies_loaded:
-                # 需要手动登录
-                self.manual_login()
+            # 本地检查cookies过期时间，TTL内复用上次结果，否则用一次HTTP请求探测
+            with self.report.span('login_check'):
+                probe = self.http.is_logged_in if self.use_http else None
+                http_logged_in = self.use_http and self.session_check.validate(probe)
+            if http_logged_in:
+                print("已通过HTTP会话加载登录状态，需要时再启动浏览器")
             else:
-                print("已加载保存的登录状态")
-                # 检查登录状态
-                if not self.check_login_status():
-                    print("登录状态已失效，需要重新登录")
-                    self.manual_login()
-            
-            # 获取热门文章列表
-            articles = self.get_hot_articles()
-            
-            if not articles:
-                print("未能获取到文章列表，请检查网站结构")
-                return
+                self.ensure_driver()
             
-            print(f"\n找到 {len(articles)} 篇文章")
-            for i, article in enumerate(articles, 1):
-                print(f"{i}. {article['title']}")
-            print()
+            # 边获取热门文章列表边处理，第一篇文章找到后即开始抓取正文
+            print(f"正在获取热门文章列表（最多 {self.max_articles} 篇）...")
+            articles = self.report.timed_iter('discovery', self.iter_hot_articles())
             
-            # 爬取每篇文章并保存为PDF
-            for i, article in enumerate(articles, 1):
-                print(f"\n处理第 {i}/{len(articles)} 篇文章...")
-                
-                # 获取文章内容
-                content_data = self.get_article_content(article['url'])
-                
-                if content_data:
-                    # 生成安全的文件名
-                    safe_title = "".join(c for c in article['title'] if c.isalnum() or c in (' ', '-', '_'))
-                    safe_title = safe_title[:50]  # 限制文件名长度
-                    filename = f"{i:02d}_{safe_title}.pdf"
+            # 爬取每篇文章并保存为PDF：主线程抓取，进程池排版，两者重叠进行
+            # 进程池必须在写线程启动之前fork出工作进程
+            pool = None
+            if self.pdf_workers > 1:
+                from scys_pdf import start_pdf_pool
+                pool = start_pdf_pool(min(self.pdf_workers, self.max_articles))
+            self.start_writer()
+            if self.search_index:
+                self.index = SearchIndex(self.output_dir)
+            jobs = []
+            found = 0
+            try:
+                for article in articles:
+                    found += 1
+                    i = article['index']
+                    print(f"\n处理第 {i} 篇文章: {article['title']}")
                     
-                    # 保存为PDF
-                    self.save_to_pdf(content_data, filename)
-                else:
-                    print(f"跳过第 {i} 篇文章（获取内容失败）")
+                    # 获取文章内容
+                    with self.report.span('fetch', article=article['url']):
+                        content_data = self.get_article_content(article['url'])
+                    
+                    if content_data:
+                        # 生成安全的文件名
+                        safe_title = "".join(c for c in article['title'] if c.isalnum() or c in (' ', '-', '_'))
+                        safe_title = safe_title[:50]  # 限制文件名长度
+                        filename = f"{i:02d}_{safe_title}.pdf"
+                        self.index_article(article, content_data, os.path.join(self.output_dir, filename))
+                        
+                        # 保存为PDF
+                        if pool:
+                            jobs.append(self.submit_pdf(pool, content_data, filename, article['url']))
+                        else:
+                            with self.report.span('pdf_build', article=article['url']):
+                                self.save_to_pdf(content_data, filename)
+                    else:
+                        print(f"跳过第 {i} 篇文章（获取内容失败）")
+                    self.record_memory(article['url'])
+                    self.recycle_driver()
                 
-                # 等待一下，避免请求过快
-                time.sleep(2)
+                if not found:
+                    self.save_debug_page()
+                    print("未能获取到文章列表，请检查网站结构")
+                    return
+                
+                if jobs:
+                    print(f"\n等待 {len(jobs)} 个PDF排版任务完成...")
+                for job in jobs:
+                    self.collect_pdf(job)
+            finally:
+                if pool:
+                    pool.shutdown(wait=True, cancel_futures=True)
+            
+            if self.writer:
+                with self.report.span('write_flush'):
+                    self.writer.flush()
+                if self.writer.errors:
+                    print(f"\n✗ {len(self.writer.errors)} 个文件写入磁盘失败:")
+                    for path, error in self.writer.errors.items():
+                        print(f"  {path}: {error}")
             
             print(f"\n完成！所有PDF已保存到 {self.output_dir} 目录")
         
@@ -411,6 +678,16 @@ class SCYSScraper:
             traceback.print_exc()
         
         finally:
+            if self.writer:
+                self.writer.close()
+            if self.index:
+                self.index.close()
+            self.http.close()
+            try:
+                report_path = self.report.write(self.report.default_path(self.output_dir))
+                print(f"运行报告: {report_path}")
+            except Exception as e:
+                print(f"写入运行报告失败: {e}")
             if self.driver:
                 print("\n关闭浏览器...")
                 self.driver.quit()
@@ -6,28 +6,120 @@
 import os
 import json
 import time
-import base64
 import re
+import argparse
+from itertools import chain
 from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
+from scys_pool import BrowserPool
+from scys_ready import PageReadiness, enable_network_tracking
+from scys_lazy import resolve_lazy_content
+from scys_lifecycle import MB, BrowserLifecycle
+from scys_blocking import ResourcePolicy
+from scys_export import WriteBehind, capture_mhtml, print_to_pdf
+from scys_discovery import iter_browser_pages, iter_html_pages, rank_links
+from scys_http import HTTPFetcher, CONTENT_XPATHS
+from scys_session import SessionExpired, SessionValidator, dom_logged_in, inject_cookies, load_cookie_file
+from scys_manifest import Manifest, canonical_url, content_hash
+from scys_search import SearchIndex
+from scys_jobs import JobQueue, backoff_delay, DISCOVERED, FETCHED, RENDERED, WRITTEN
+from scys_ratelimit import AdaptiveRateLimiter, limited
+from scys_metrics import RunReport, collect_page_metrics
+from scys_driver import chrome_service
+
+# 策略1: 热门区域容器
+HOT_SECTION_XPATH = (
+    "//div[contains(@class, 'hot') or contains(text(), '热门')]/ancestor::section | " +
+    "//h2[contains(text(), '热门')]/following-sibling::div | " +
+    "//div[contains(@class, 'hot')]"
+)
+
+# 策略2: 看起来像文章标题的链接
+ARTICLE_LINK_XPATH = "//a[contains(@class, 'title') or contains(@class, 'post') or contains(@class, 'article')]"
+
+# Page.printToPDF 参数（A4），直接打印和MHTML转PDF共用
+PDF_SETTINGS = {
+    'landscape': False,
+    'displayHeaderFooter': False,
+    'printBackground': True,
+    'preferCSSPageSize': True,
+    'paperWidth': 8.27,
+    'paperHeight': 11.69,
+    'marginTop': 0.4,
+    'marginBottom': 0.4,
+    'marginLeft': 0.4,
+    'marginRight': 0.4,
+}
+
+# 输出格式对应的扩展名
+OUTPUT_EXTENSIONS = {'pdf': '.pdf', 'mhtml': '.mhtml'}
+
+# 写入全文索引的正文：第一个匹配的正文容器，找不到时取整个页面
+ARTICLE_TEXT_JS = """
+var xpaths = arguments[0];
+for (var i = 0; i < xpaths.length; i++) {
+    try {
+        var node = document.evaluate(xpaths[i], document, null,
+                                     XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        if (node && node.innerText && node.innerText.trim()) return node.innerText;
+    } catch (e) {}
+}
+return document.body.innerText;
+"""
 
 class SCYSScraperAdvanced:
-    def __init__(self):
+    def __init__(self, output_dir="scys_pdfs"):
         self.base_url = "https://scys.com/"
         self.cookies_file = "scys_cookies.json"
-        self.output_dir = "scys_pdfs"
+        self.output_dir = output_dir  # 构造时即创建，需要其他目录时通过参数传入
+        self.workers = 1  # 并行渲染PDF的无头浏览器数量，1表示单浏览器顺序渲染
+        self.page_timeout = 15  # 每个页面等待加载完成的超时预算（秒）
+        self.max_rps = 1.0  # 每秒最多请求数（浏览器和HTTP共用），实际速率随服务端状态自适应
+        self.max_concurrency = 4  # 同时等待主文档响应的最大请求数（启动工作池时至少放宽到workers）
+        self.use_http = True  # 列表发现优先用HTTP直接请求，浏览器只在生成PDF时启动
+        self.session_ttl = 600  # 登录校验结果的缓存时间（秒），期间启动不再探测
+        self.headless = False  # 按需启动浏览器时是否使用无头模式（守护模式下为True）
+        self.interactive = True  # 登录失效时是否提示手动登录（守护模式下为False）
+        self.poll_interval = 900  # 守护模式下两次轮询热门列表的间隔（秒）
+        self.recycle_tab_pages = 20  # 同一个标签页导航多少次后换新标签页（旧的渲染进程随之退出），0表示不换
+        self.recycle_pages = 200  # 浏览器加载多少个页面后重建，0表示不限制
+        self.recycle_rss_mb = 1500  # 浏览器进程树RSS超过该值（MB）时重建，0表示不限制
+        self.incremental = True  # 根据输出目录中的清单跳过内容未变化的文章
+        self.resume = True  # 记录每篇文章的处理进度，中断后重新运行时从检查点继续
+        self.max_retries = 2  # 每篇文章渲染失败后的最多重试次数
+        self.retry_backoff = 2.0  # 第一次重试前的等待秒数，之后每次翻倍（最多60秒）
+        self.write_behind = True  # PDF由后台线程写盘，渲染下一篇与写入上一篇重叠进行
+        self.write_buffer_mb = 64  # 等待写盘的数据上限（MB），超过时渲染等待写线程
+        self.resource_policy = 'default'  # 资源拦截策略：off / default（拦截统计追踪、字体、视频）/ images（只保留图片）
+        self.extra_blocklist = []  # 额外拦截的URL规则，如 '*example.com/widget*'
+        self.search_index = True  # 文章正文写入本地全文索引（search.sqlite3），用 scys_search.py 按关键词查找
+        self.output_format = 'pdf'  # 输出格式：pdf / mhtml（Page.captureSnapshot 单文件归档，不打印，之后可用 --convert 批量转PDF）
+        self.max_articles = 5  # 最多发现多少篇热门文章
+        self.max_pages = 10  # 最多沿"下一页"链接翻多少页
+        self.max_scrolls = 10  # 浏览器发现时每页最多向下滚动加载几次
         self.driver = None
+        self.readiness = None
+        self.manifest = None
+        self.jobs = None
+        self.index = None
+        self.writer = None
+        self.last_content_hash = None
+        self.last_error = None
+        self.discovery_source = None  # 最近一次发现使用的通道：'http' 或 'browser'
+        self.lifecycle = BrowserLifecycle(on_new_tab=lambda: self.apply_resource_policy(announce=False))
+        self.limiter = AdaptiveRateLimiter(max_rps=self.max_rps, max_concurrency=self.max_concurrency)
+        self.http = HTTPFetcher(self.base_url, self.cookies_file, limiter=self.limiter)
+        self.session_check = SessionValidator(self.cookies_file, ttl=self.session_ttl)
+        self.report = RunReport('advanced')
         
         # 创建输出目录
         Path(self.output_dir).mkdir(exist_ok=True)
     
     def setup_driver(self, headless=False):
         """设置Chrome浏览器"""
+        # selenium 只在需要浏览器时导入，HTTP通道的发现和增量检查不需要它
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
         chrome_options = Options()
         
         if headless:
@@ -58,12 +150,16 @@ class SCYSScraperAdvanced:
         }
         chrome_options.add_experimental_option('prefs', prefs)
         
+        # 记录CDP网络事件，用于判断网络空闲
+        enable_network_tracking(chrome_options)
+        # driver.get 在主文档解析完(DOMContentLoaded)就返回，图片等子资源由 PageReadiness 等待
+        chrome_options.page_load_strategy = 'eager'
+        
         try:
-            from webdriver_manager.chrome import ChromeDriverManager
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            # chromedriver路径按Chrome版本缓存，命中时不联网
+            self.driver = webdriver.Chrome(service=chrome_service(), options=chrome_options)
         except Exception as e:
-            print(f"使用webdriver_manager失败: {e}")
+            print(f"使用缓存的chromedriver失败: {e}")
             print("尝试使用系统Chrome...")
             try:
                 self.driver = webdriver.Chrome(options=chrome_options)
@@ -72,19 +168,359 @@ class SCYSScraperAdvanced:
                 chrome_options.binary_location = "/usr/bin/chromium-browser"
                 self.driver = webdriver.Chrome(options=chrome_options)
         
+        self.readiness = PageReadiness(self.driver, timeout=self.page_timeout)
+        self.apply_resource_policy()
+        self.lifecycle.tab_pages = self.recycle_tab_pages
+        self.lifecycle.max_pages = self.recycle_pages
+        self.lifecycle.ceiling_mb = self.recycle_rss_mb
+        self.lifecycle.attach(self.driver)
+        self.report.mark('driver_ready')
         print("浏览器初始化成功")
     
-    def load_cookies(self):
-        """加载已保存的cookies"""
-        if not os.path.exists(self.cookies_file):
+    def apply_resource_policy(self, announce=True):
+        """在浏览器上启用资源拦截，失败时不拦截继续运行（拦截规则按标签页生效，换标签页后要重新设置）"""
+        try:
+            policy = ResourcePolicy.from_name(self.resource_policy, self.extra_blocklist)
+            if policy.apply(self.driver) and announce:
+                print(f"已启用资源拦截（{self.resource_policy}）: {policy.describe()}")
+        except Exception as e:
+            print(f"启用资源拦截失败，将加载全部资源: {e}")
+    
+    def ensure_driver(self):
+        """需要浏览器时才启动Chrome并恢复登录状态"""
+        if self.driver:
+            return self.driver
+        
+        with self.report.span('driver_startup'):
+            self.setup_driver(headless=self.headless)
+        with self.report.span('cookie_load'):
+            cookies_loaded = self.load_cookies()
+        if not cookies_loaded:
+            self.manual_login()
+        else:
+            if self.http.logged_in is False:
+                # HTTP请求已被重定向到登录页，缓存的校验结果不可信
+                self.session_check.invalidate()
+            # 验证登录状态：本地过期检查和缓存都无法判断时，才打开首页做一次DOM查询
+            with self.report.span('login_check'):
+                logged_in = self.session_check.validate(self.probe_login)
+            
+            if not logged_in:
+                print("⚠ 登录状态已过期，需要重新登录")
+                self.manual_login()
+            else:
+                print("✓ 登录状态有效")
+        return self.driver
+    
+    def probe_login(self):
+        """打开首页，用一次DOM查询判断是否已登录"""
+        self.open_page(self.base_url)
+        return dom_logged_in(self.driver)
+    
+    def open_page(self, url):
+        """打开页面并等待真正加载完成，加载结果反馈给限速器"""
+        self.lifecycle.before_navigation()
+        # 限速名额只覆盖服务端返回主文档这一段；之后等待子资源和DOM静默是浏览器本地的事，
+        # 不占名额，就绪超时也不算服务端变慢
+        with limited(self.limiter) as slot:
+            self.readiness.reset()
+            self.report.mark('first_navigation')
+            self.driver.get(url)
+            slot.report(status=self.readiness.document_response(), url=self.driver.current_url)
+        return self.readiness.wait()
+    
+    def close(self):
+        """关闭浏览器"""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except:
+                pass
+            self.driver = None
+        self.lifecycle.detach()
+    
+    def record_memory(self, url):
+        """采样浏览器内存，把本篇文章处理期间的峰值写入运行报告"""
+        self.lifecycle.sample()
+        peak = self.lifecycle.article_peak()
+        if peak:
+            self.report.annotate(url, rss_peak_mb=round(peak / MB, 1), rss_source=self.lifecycle.source)
+    
+    def needs_recycle(self):
+        """浏览器加载的页面数或内存占用超过上限时返回True（使用最近一次内存采样）"""
+        return self.lifecycle.restart_reason() is not None
+    
+    def recycle_driver(self):
+        """关闭当前浏览器，下次需要时由 ensure_driver 重新启动（cookies通过CDP注入，不需要额外导航）"""
+        print(f"♻ 回收浏览器（{self.lifecycle.restart_reason()}）")
+        self.close()
+    
+    def driver_alive(self):
+        """浏览器和chromedriver是否仍能响应"""
+        if not self.driver:
             return False
+        try:
+            self.driver.execute_script("return 1;")
+            return True
+        except Exception:
+            return False
+    
+    def restart_driver(self):
+        """浏览器崩溃后重新启动并通过CDP恢复登录状态（session已校验过，不再探测）"""
+        print("↻ 浏览器无响应，正在重启...")
+        self.close()
+        with self.report.span('driver_restart'):
+            self.setup_driver(headless=self.headless)
+            if not self.load_cookies():
+                self.close()
+                raise RuntimeError("重启浏览器后无法加载登录状态")
+    
+    def spawn_worker(self, index=0):
+        """创建一个复用已保存cookies的无头worker"""
+        worker = SCYSScraperAdvanced(output_dir=self.output_dir)
+        worker.base_url = self.base_url
+        worker.cookies_file = self.cookies_file
+        worker.headless = True
+        worker.page_timeout = self.page_timeout
+        worker.resource_policy = self.resource_policy
+        worker.extra_blocklist = self.extra_blocklist
+        worker.output_format = self.output_format  # 与 plan_article 选定的扩展名一致
+        worker.recycle_tab_pages = self.recycle_tab_pages
+        worker.recycle_pages = self.recycle_pages
+        worker.recycle_rss_mb = self.recycle_rss_mb
+        worker.max_retries = self.max_retries
+        worker.retry_backoff = self.retry_backoff
+        worker.limiter = self.limiter  # 所有worker共用一个限速器
+        worker.jobs = self.jobs  # 任务检查点由worker线程直接更新
+        worker.index = self.index
+        worker.writer = self.writer  # 所有worker共用一个写线程
+        worker.report = self.report
+        with self.report.span('worker_startup'):
+            worker.setup_driver(headless=worker.headless)
+            cookies_loaded = worker.load_cookies()
+        if not cookies_loaded:
+            worker.close()
+            raise RuntimeError(f"worker {index + 1} 无法加载登录状态")
+        return worker
+    
+    def start_pool(self, size):
+        """启动浏览器工作池，worker超过页面数或内存上限时自动重建"""
+        if self.limiter:
+            # 并发上限不能低于worker数，否则限速器会把工作池串行化
+            self.limiter.resize(size)
+        return BrowserPool(self.spawn_worker, size, destroy=lambda w: w.close(),
+                           should_recycle=lambda w: w.needs_recycle()).start()
+    
+    def save_pages_parallel(self, articles, total=None, pool=None):
+        """用浏览器工作池并行保存PDF，返回与articles顺序一致的 (文章, 输出路径或False, 页面内容哈希)
+
+        articles 可以是生成器：每发现一篇就提交给空闲的worker，渲染与发现同时进行；
+        传入已启动的pool时复用其中的浏览器（守护模式）
+        """
+        def render(worker, article):
+            return (article,) + worker.render_with_retry(article, total)
+        
+        if pool is not None:
+            return pool.map(render, articles)
         
+        size = self.workers
+        if isinstance(articles, list):
+            size = min(size, len(articles))
+        pool = self.start_pool(min(size, self.max_articles))
         try:
-            with open(self.cookies_file, 'r') as f:
-                cookies = json.load(f)
+            return pool.map(render, articles)
+        finally:
+            pool.close()
+    
+    def render_article(self, article, total=None):
+        """渲染一篇文章，返回 (输出路径或False, 页面内容哈希)"""
+        position = f"{article['index']}/{total}" if total else f"{article['index']}"
+        print(f"\n[{position}] {article['title'][:50]}...")
+        result = self.save_page_as_pdf(
+            article['url'], article['title'], article['index'],
+            filepath=article.get('filepath'), known_hash=article.get('known_hash')
+        )
+        return result, self.last_content_hash
+    
+    def render_with_retry(self, article, total=None):
+        """渲染一篇文章，失败时按指数退避重试，浏览器崩溃时先重启；返回 (输出路径或False, 页面内容哈希)
+
+        成功后记录 rendered 检查点；重试次数用完时任务标记为 failed，下次运行再试。
+        登录失效（SessionExpired）不重试，直接向上抛出，任务保留在当前检查点。
+        """
+        url = article['url']
+        for attempt in range(1, self.max_retries + 2):
+            self.last_error = None
+            if not self.driver_alive():
+                self.restart_driver()
+            filepath, page_hash = self.render_article(article, total)
+            if filepath:
+                if self.jobs:
+                    self.checkpoint_rendered(url, filepath, page_hash)
+                return filepath, page_hash
             
+            final = attempt > self.max_retries
+            if self.jobs:
+                self.jobs.fail(url, self.last_error, final=final)
+            if final:
+                break
+            delay = backoff_delay(attempt, self.retry_backoff)
+            print(f"  {delay:.1f} 秒后重试（第 {attempt}/{self.max_retries} 次）...")
+            self.report.add('retry_wait', delay, article=url)
+            time.sleep(delay)
+        
+        print(f"✗ 重试 {self.max_retries} 次后仍失败: {article['title'][:50]}")
+        self.report.annotate(url, error=str(self.last_error) if self.last_error else None)
+        return False, None
+    
+    def start_writer(self):
+        """启动后台写盘线程（write_behind 关闭时PDF在渲染线程中直接写盘）"""
+        if self.write_behind and self.writer is None:
+            self.writer = WriteBehind(self.write_buffer_mb * 1024 * 1024,
+                                      on_complete=self.on_pdf_written).start()
+        return self.writer
+    
+    def on_pdf_written(self, pending):
+        """写线程完成一个文件后调用：记录写盘耗时，失败时报告错误"""
+        url = pending.tag
+        self.report.add('disk_write', pending.seconds, article=url)
+        if pending.error:
+            self.report.annotate(url, write_error=pending.error)
+            if self.jobs:
+                self.jobs.fail(url, pending.error, final=True)
+    
+    def checkpoint_rendered(self, url, filepath, page_hash):
+        """记录 rendered 检查点；使用写线程时排在该文件的写操作之后，文件落盘后才生效"""
+        def advance():
+            if self.writer is None or filepath not in self.writer.errors:
+                self.jobs.advance(url, RENDERED, {'filepath': filepath, 'page_hash': page_hash})
+        
+        if self.writer:
+            self.writer.submit(advance)
+        else:
+            advance()
+    
+    def plan_article(self, article):
+        """对照清单判断文章是否需要渲染，需要时补充输出路径等信息，否则返回None"""
+        article = dict(article)
+        if not self.incremental:
+            return article
+        
+        entry = self.manifest.get(article['url'])
+        new_hash = None
+        validators = {}
+        if self.use_http:
+            # 直接请求HTML计算正文哈希，无需打开浏览器；上次的正文也来自服务端HTML时
+            # 带上校验值做条件请求，304说明HTML没有变化，不必下载和解析
+            trusted = bool(entry and (entry['content_hash'] or '').startswith('http:'))
+            probe = self.http.probe_article(
+                article['url'],
+                entry['etag'] if trusted else None,
+                entry['last_modified'] if trusted else None
+            )
+            if probe:
+                validators = {'etag': probe['etag'], 'last_modified': probe['last_modified']}
+                if probe['not_modified']:
+                    new_hash = entry['content_hash']
+                elif probe['data']:
+                    new_hash = content_hash(probe['data']['content'], 'http')
+                self.report.annotate(article['url'], probe=304 if probe['not_modified'] else 200)
+        
+        if self.manifest.is_unchanged(article['url'], new_hash):
+            self.manifest.touch(article['url'], **validators)
+            print(f"  - 未变化，跳过: {article['title'][:50]}")
+            return None
+        
+        article['content_hash'] = new_hash
+        if new_hash:
+            # 校验值只有在正文来自服务端HTML时才可信，渲染成功后随清单一起保存
+            article.update(validators)
+        article['known_hash'] = entry['content_hash'] if entry else None
+        article['filepath'] = self.manifest.output_path_for(
+            article['url'], article['title'], article['index'], self.output_dir,
+            OUTPUT_EXTENSIONS[self.output_format]
+        )
+        return article
+    
+    def plan_incremental(self, articles):
+        """对照清单筛选新增或内容变化的文章，并确定每篇文章的输出路径"""
+        pending = []
+        for i, article in enumerate(articles, 1):
+            article = self.plan_article(dict(article, index=article.get('index', i)))
+            if article:
+                pending.append(article)
+        return pending
+    
+    def iter_pending(self, stats, known=None):
+        """发现 → 增量检查 流水线，逐篇产出需要渲染的文章
+
+        stats 记录发现和跳过的数量，以及本次发现的规范化URL集合；
+        known 为上一次轮询已发现的URL集合，其中的文章直接跳过（守护模式只处理新条目）
+        """
+        for article in self.iter_hot_articles():
+            stats['found'] += 1
+            key = canonical_url(article['url'])
+            stats['urls'].add(key)
+            if known and key in known:
+                stats['known'] += 1
+                continue
+            if self.jobs and not self.jobs.add(article):
+                # 上次中断时未完成的任务，已在 iter_resumed 中处理
+                continue
+            print(f"  发现 {article['index']}. {article['title'][:60]}")
+            article = self.plan_job(article)
+            if article:
+                yield article
+            else:
+                stats['skipped'] += 1
+    
+    def plan_job(self, article):
+        """增量检查一篇文章并记录检查点：需要渲染时为 fetched，未变化时直接完成"""
+        with self.report.span('change_check', article=article['url']):
+            planned = self.plan_article(article)
+        if self.jobs:
+            if planned:
+                self.jobs.advance(article['url'], FETCHED, planned)
+            else:
+                self.jobs.advance(article['url'], WRITTEN)
+        return planned
+    
+    def iter_resumed(self, stats, done):
+        """上次中断时未完成的任务，按检查点继续
+
+        已生成PDF的任务直接放入done（只需写入清单），未完成增量检查的重新检查，
+        其余逐篇产出等待渲染
+        """
+        for article in self.jobs.pending():
+            job = article.pop('job')
+            stats['resumed'] += 1
+            stats['urls'].add(canonical_url(article['url']))
+            print(f"  继续 {article['index']}. {article['title'][:60]}（{job['state']}）")
+            
+            filepath = article.get('filepath')
+            if job['state'] == RENDERED and filepath and os.path.exists(filepath):
+                done.append((article, filepath, article.get('page_hash')))
+                continue
+            if job['state'] == DISCOVERED:
+                article = self.plan_job(article)
+                if not article:
+                    stats['skipped'] += 1
+                    continue
+            yield article
+    
+    def load_cookies(self):
+        """加载已保存的cookies，优先在导航之前通过CDP写入"""
+        cookies = load_cookie_file(self.cookies_file)
+        if not cookies:
+            return False
+        if inject_cookies(self.driver, cookies, self.base_url):
+            print("已加载保存的登录状态")
+            return True
+        
+        try:
+            # 回退：先进入同一域名再写入cookie，无需等待页面加载完
+            self.report.mark('first_navigation')
             self.driver.get(self.base_url)
-            time.sleep(2)
             
             for cookie in cookies:
                 try:
@@ -94,8 +530,9 @@ class SCYSScraperAdvanced:
                 except Exception as e:
                     print(f"添加cookie失败: {e}")
             
+            self.readiness.reset()
             self.driver.refresh()
-            time.sleep(2)
+            self.readiness.wait()
             print("已加载保存的登录状态")
             return True
         except Exception as e:
@@ -109,16 +546,25 @@ class SCYSScraperAdvanced:
             with open(self.cookies_file, 'w') as f:
                 json.dump(cookies, f, indent=2)
             print(f"✓ Cookies已保存到 {self.cookies_file}")
+            self.http.load_cookies()
         except Exception as e:
             print(f"保存cookies失败: {e}")
     
     def manual_login(self):
         """提示用户手动登录"""
+        if not self.interactive:
+            raise RuntimeError("登录状态已失效，守护模式无法手动登录，请以普通（交互）模式重新运行一次完成登录")
+        
         print("\n" + "="*70)
         print("  请在打开的浏览器窗口中手动登录生财有术网站")
         print("  登录成功后，请返回终端并按回车键继续...")
         print("="*70 + "\n")
         
+        # 登录页可能依赖被拦截的第三方脚本，登录期间暂停拦截
+        try:
+            ResourcePolicy.clear(self.driver)
+        except Exception:
+            pass
         self.driver.get(self.base_url)
         
         try:
@@ -127,160 +573,328 @@ class SCYSScraperAdvanced:
             time.sleep(30)
             print("等待30秒后自动继续...")
         
+        self.apply_resource_policy()
         self.save_cookies()
+        self.session_check.record(True)
         print("✓ 登录状态已保存！\n")
     
     def find_hot_articles(self):
-        """查找热门文章"""
+        """查找热门文章，返回完整列表（需要边发现边处理时使用 iter_hot_articles）"""
         print("正在查找热门文章...")
-        
-        # 保存页面以便分析
-        page_source = self.driver.page_source
-        
-        # 尝试多种策略查找热门文章
-        articles = []
-        
-        # 策略1: 查找包含"热门"的区域
+        articles = list(self.iter_hot_articles())
+        if len(articles) < min(5, self.max_articles):
+            self.save_debug_page()
+        return articles
+    
+    def save_debug_page(self):
+        """保存首页源码供调试"""
+        debug_file = "debug_page.html"
         try:
-            hot_sections = self.driver.find_elements(By.XPATH, 
-                "//div[contains(@class, 'hot') or contains(text(), '热门')]/ancestor::section | " +
-                "//h2[contains(text(), '热门')]/following-sibling::div | " +
-                "//div[contains(@class, 'hot')]"
-            )
-            
-            for section in hot_sections[:3]:
-                links = section.find_elements(By.TAG_NAME, 'a')
-                for link in links:
-                    try:
-                        href = link.get_attribute('href')
-                        text = link.text.strip()
-                        if href and text and len(text) > 5:
-                            articles.append({
-                                'title': text,
-                                'url': href
-                            })
-                            if len(articles) >= 5:
-                                return articles[:5]
-                    except:
-                        continue
+            page_source = self.driver.page_source if self.driver else self.http.fetch_html(self.base_url)
+            with open(debug_file, 'w', encoding='utf-8') as f:
+                f.write(page_source or '')
+            print(f"⚠ 找到的文章数量不足，页面已保存到 {debug_file} 供调试")
         except Exception as e:
-            print(f"策略1失败: {e}")
+            print(f"保存调试页面失败: {e}")
+    
+    def iter_hot_articles(self):
+        """流式发现热门文章：沿分页和滚动加载逐批产出，达到 max_articles 后停止
         
-        # 策略2: 查找所有看起来像文章标题的链接
-        if len(articles) < 5:
-            try:
-                all_links = self.driver.find_elements(By.XPATH,
-                    "//a[contains(@class, 'title') or contains(@class, 'post') or contains(@class, 'article')]"
-                )
-                
-                for link in all_links:
-                    try:
-                        href = link.get_attribute('href')
-                        text = link.text.strip()
-                        if href and text and len(text) > 5:
-                            # 避免重复
-                            if not any(a['url'] == href for a in articles):
-                                articles.append({
-                                    'title': text,
-                                    'url': href
-                                })
-                                if len(articles) >= 5:
-                                    return articles[:5]
-                    except:
-                        continue
-            except Exception as e:
-                print(f"策略2失败: {e}")
+        按规范化URL去重，只保存URL集合，内存不随快照数量增长
+        """
+        seen = set()
+        first_batch = None
+        pages = None
         
-        # 策略3: 使用BeautifulSoup分析
-        if len(articles) < 5:
-            try:
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(page_source, 'html.parser')
-                
-                # 查找所有链接
-                for a in soup.find_all('a', href=True):
-                    text = a.get_text(strip=True)
-                    href = a['href']
-                    
-                    # 过滤条件
-                    if (len(text) > 10 and 
-                        ('scys.com' in href or href.startswith('/')) and
-                        not any(x in href.lower() for x in ['login', 'register', 'about', 'help'])):
-                        
-                        full_url = href if href.startswith('http') else self.base_url.rstrip('/') + href
-                        
-                        if not any(a['url'] == full_url for a in articles):
-                            articles.append({
-                                'title': text,
-                                'url': full_url
-                            })
-                            if len(articles) >= 5:
-                                break
-            except Exception as e:
-                print(f"策略3失败: {e}")
+        # 优先直接请求HTML，不需要浏览器（HTTP会话已确认失效时除外）
+        if self.use_http and self.http.logged_in is not False:
+            pages = iter_html_pages(
+                self.http.fetch_html, self.base_url, [ARTICLE_LINK_XPATH], HOT_SECTION_XPATH, 3,
+                max_pages=self.max_pages
+            )
+            with self.report.span('discovery'):
+                links = next(pages, None)
+            first_batch = list(self.pick_hot_articles(links or []))
+            if len({url for _, url in first_batch}) < min(5, self.max_articles):
+                # 服务端HTML内容不完整（例如由前端渲染），回退到浏览器
+                print("HTTP请求未找到足够的文章，改用浏览器查找...")
+                pages.close()
+                pages = first_batch = None
         
-        # 保存调试信息
-        if len(articles) < 5:
-            debug_file = "debug_page.html"
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(page_source)
-            print(f"⚠ 找到的文章数量不足，页面已保存到 {debug_file} 供调试")
+        if pages is None:
+            self.ensure_driver()
+            self.discovery_source = 'browser'
+            pages = iter_browser_pages(
+                self.driver, self.open_page, self.base_url,
+                [ARTICLE_LINK_XPATH], HOT_SECTION_XPATH, 3,
+                max_pages=self.max_pages, max_scrolls=self.max_scrolls,
+                settle=self.settle_page
+            )
+        else:
+            self.discovery_source = 'http'
+        
+        def batches():
+            if first_batch is not None:
+                yield first_batch
+            while True:
+                try:
+                    # 一次JS调用取回一批链接的快照，各策略都在Python中处理
+                    with self.report.span('discovery'):
+                        links = next(pages, None)
+                except Exception as e:
+                    print(f"获取链接快照失败: {e}")
+                    return
+                if links is None:
+                    return
+                yield self.pick_hot_articles(links)
         
-        return articles[:5]
+        found = []
+        for batch in batches():
+            for title, url in batch:
+                key = canonical_url(url)
+                if key in seen:
+                    continue
+                seen.add(key)
+                article = {'title': title, 'url': url, 'index': len(seen)}
+                if self.discovery_source == 'browser' and self.workers <= 1:
+                    # 单浏览器时发现和渲染共用driver，先完成发现再交给渲染
+                    found.append(article)
+                else:
+                    yield article
+                if len(seen) >= self.max_articles:
+                    pages.close()
+                    yield from found
+                    return
+        yield from found
+    
+    def settle_page(self):
+        """滚动加载后等待新内容就绪"""
+        self.readiness.reset()
+        self.readiness.wait()
     
-    def save_page_as_pdf(self, url, title, index):
-        """使用浏览器打印功能保存页面为PDF"""
+    def pick_hot_articles(self, links):
+        """对一批链接快照打分排序，按得分从高到低产出 (标题, URL)
+
+        前3个热门区域中的链接 > 标题类链接（ARTICLE_LINK_XPATH）> 按链接地址和文本长度
+        过滤出的兜底链接；前两类不够 max_articles 篇时由兜底链接补足
+        """
+        yield from rank_links(links, self.base_url)
+    
+    def save_page_as_pdf(self, url, title, index, filepath=None, known_hash=None):
+        """使用浏览器打印功能保存页面为PDF（output_format='mhtml' 时保存MHTML快照），成功时返回输出路径"""
         try:
             print(f"正在访问: {title[:50]}...")
-            self.driver.get(url)
-            time.sleep(3)
-            
             # 等待页面加载完成
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            # 滚动页面确保所有内容加载
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
-            self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
+            with self.report.span('page_load', article=url):
+                self.open_page(url)
+            if 'login' in self.driver.current_url.lower():
+                raise SessionExpired(f"打开文章时被重定向到登录页: {self.driver.current_url}")
             
-            # 生成安全的文件名
-            safe_title = re.sub(r'[<>:"/\\|?*]', '', title)
-            safe_title = safe_title[:80]
-            filename = f"{index:02d}_{safe_title}.pdf"
-            filepath = os.path.join(self.output_dir, filename)
+            # 懒加载图片改为立即加载，仍未加载的再逐屏滚动，全部加载完成即结束
+            with self.report.span('lazy_load', article=url):
+                lazy = resolve_lazy_content(self.driver, timeout=self.page_timeout)
+                self.readiness.wait()
+            if lazy['pending']:
+                print(f"⚠ 仍有 {lazy['pending']} 张图片未加载完成")
+            # 页面完全加载后和打印后各采样一次内存，取峰值
+            self.lifecycle.sample()
             
-            # 使用Chrome DevTools Protocol打印PDF
-            print(f"正在生成PDF...")
+            self.report.annotate(
+                url,
+                title=title,
+                lazy=lazy,
+                status=self.readiness.document_status,
+                requests=self.readiness.requests,
+                bytes_received=self.readiness.bytes_received,
+                blocked=dict(self.readiness.blocked),
+                metrics=collect_page_metrics(self.driver)
+            )
             
-            pdf_settings = {
-                'landscape': False,
-                'displayHeaderFooter': False,
-                'printBackground': True,
-                'preferCSSPageSize': True,
-                'paperWidth': 8.27,  # A4
-                'paperHeight': 11.69,
-                'marginTop': 0.4,
-                'marginBottom': 0.4,
-                'marginLeft': 0.4,
-                'marginRight': 0.4,
-            }
+            # 生成安全的文件名
+            if not filepath:
+                safe_title = re.sub(r'[<>:"/\\|?*]', '', title)
+                safe_title = safe_title[:80]
+                ext = OUTPUT_EXTENSIONS[self.output_format]
+                filepath = os.path.join(self.output_dir, f"{index:02d}_{safe_title}{ext}")
+            filename = os.path.basename(filepath)
             
-            result = self.driver.execute_cdp_cmd('Page.printToPDF', pdf_settings)
+            # 页面正文哈希，与清单中的记录相同时不必重新打印
+            self.last_content_hash = content_hash(
+                self.driver.execute_script("return document.body.innerText;"), 'dom'
+            )
+            if known_hash == self.last_content_hash and os.path.exists(filepath):
+                print(f"✓ 内容未变化，保留: {filename}")
+                self.index_article(url, title, filepath)
+                return filepath
             
-            with open(filepath, 'wb') as f:
-                f.write(base64.b64decode(result['data']))
+            span = lambda stage: self.report.span(stage, article=url)
+            if self.output_format == 'mhtml':
+                # 只保存快照，不做分页排版；需要PDF时用 --convert 批量转换
+                print(f"正在保存MHTML快照...")
+                capture_mhtml(self.driver, filepath, span=span, writer=self.writer, tag=url)
+            else:
+                # 使用Chrome DevTools Protocol打印PDF
+                print(f"正在生成PDF...")
+                # 流式写入临时文件后原子重命名，内存占用与PDF大小无关
+                print_to_pdf(self.driver, filepath, PDF_SETTINGS, span=span,
+                             writer=self.writer, tag=url)
             
             print(f"✓ 已保存: {filename}")
-            return True
+            self.index_article(url, title, filepath)
+            return filepath
             
+        except SessionExpired:
+            raise
         except Exception as e:
-            print(f"✗ 保存失败: {e}")
-            import traceback
-            traceback.print_exc()
+            # 由 render_with_retry 决定是否重试，这里只记录原因
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"✗ 保存失败: {self.last_error}")
             return False
+        finally:
+            self.record_memory(url)
+    
+    def index_article(self, url, title, filepath):
+        """把当前页面的正文写入全文索引，失败时只提示，不影响归档"""
+        if not self.index:
+            return
+        try:
+            with self.report.span('search_index', article=url):
+                text = self.driver.execute_script(ARTICLE_TEXT_JS, list(CONTENT_XPATHS))
+                self.index.add(url, title, text or '', filepath,
+                               meta={'source': 'browser', 'format': self.output_format})
+        except Exception as e:
+            print(f"⚠ 写入全文索引失败: {e}")
+    
+    def spawn_converter(self, index=0):
+        """创建一个转换快照用的无头浏览器；MHTML自带全部资源，不需要登录，也不拦截资源"""
+        worker = SCYSScraperAdvanced(output_dir=self.output_dir)
+        worker.page_timeout = self.page_timeout
+        worker.resource_policy = 'off'
+        worker.headless = True
+        worker.recycle_tab_pages = self.recycle_tab_pages
+        worker.recycle_pages = self.recycle_pages
+        worker.recycle_rss_mb = self.recycle_rss_mb
+        worker.writer = self.writer
+        worker.report = self.report
+        with self.report.span('worker_startup'):
+            worker.setup_driver(headless=True)
+        return worker
+    
+    @staticmethod
+    def is_converted(snapshot_path):
+        """快照对应的PDF已存在且比快照新"""
+        pdf_path = os.path.splitext(snapshot_path)[0] + '.pdf'
+        return os.path.exists(pdf_path) and os.path.getmtime(pdf_path) >= os.path.getmtime(snapshot_path)
+    
+    def convert_snapshot(self, snapshot_path):
+        """在浏览器中打开MHTML快照并打印为同名PDF，返回PDF路径，失败时返回None"""
+        pdf_path = os.path.splitext(snapshot_path)[0] + '.pdf'
+        name = os.path.basename(snapshot_path)
+        try:
+            span = lambda stage: self.report.span(stage, article=snapshot_path)
+            with span('snapshot_load'):
+                # 本地文件不经过限速器
+                self.lifecycle.before_navigation()
+                self.readiness.reset()
+                self.driver.get(Path(snapshot_path).resolve().as_uri())
+                self.readiness.wait()
+            print_to_pdf(self.driver, pdf_path, PDF_SETTINGS, span=span,
+                         writer=self.writer, tag=snapshot_path)
+            print(f"✓ 已转换: {name}")
+            return pdf_path
+        except Exception as e:
+            print(f"✗ 转换失败: {name} ({type(e).__name__}: {e})")
+            return None
+        finally:
+            self.record_memory(snapshot_path)
+    
+    def convert_snapshots(self, paths=None, force=False):
+        """批量把MHTML快照转换为PDF，返回成功转换的数量
+
+        与抓取完全分离：只需要快照文件和Chrome，可以在抓取结束后、在后台或在其他机器上运行；
+        paths 为空时转换输出目录中的全部 .mhtml 文件；PDF已是最新的快照跳过（force=True 时总是转换）；
+        workers > 1 时并行转换
+        """
+        if not paths:
+            paths = sorted(str(path) for path in Path(self.output_dir).glob('*.mhtml'))
+        pending = [path for path in paths if force or not self.is_converted(path)]
+        if len(pending) < len(paths):
+            print(f"{len(paths) - len(pending)} 个快照的PDF已是最新，跳过")
+        if not pending:
+            print("没有需要转换的MHTML快照")
+            return 0
+        
+        print(f"转换 {len(pending)} 个MHTML快照为PDF...")
+        self.start_writer()
+        pool = BrowserPool(self.spawn_converter, min(self.workers, len(pending)),
+                           destroy=lambda w: w.close(),
+                           should_recycle=lambda w: w.needs_recycle()).start()
+        try:
+            results = pool.map(lambda worker, path: worker.convert_snapshot(path), pending)
+        finally:
+            pool.close()
+            if self.writer:
+                self.writer.flush()
+        
+        errors = self.writer.errors if self.writer else {}
+        converted = sum(1 for path in results if path and path not in errors)
+        print(f"\n完成！转换 {converted}/{len(pending)} 个快照")
+        return converted
+    
+    def scrape_once(self, pool=None, known=None):
+        """发现 → 增量检查 → 渲染 → 写入清单，返回统计信息
+
+        返回的 stats 包含 found / skipped / known / resumed / rendered / saved / failed
+        以及本次发现的 urls 集合
+        """
+        # 发现、增量检查、渲染组成流水线，第一篇文章发现后即开始渲染；
+        # 启用检查点时先继续上次中断的任务
+        stats = {'found': 0, 'skipped': 0, 'known': 0, 'resumed': 0,
+                 'rendered': 0, 'saved': 0, 'failed': 0, 'write_errors': 0, 'urls': set()}
+        results = []
+        pending = self.iter_pending(stats, known)
+        if self.jobs:
+            pending = chain(self.iter_resumed(stats, results), pending)
+        if pool is not None or self.workers > 1:
+            if pool is None:
+                print(f"并行模式: {self.workers} 个无头浏览器")
+            results.extend(self.save_pages_parallel(pending, pool=pool))
+        else:
+            for article in pending:
+                self.ensure_driver()
+                # 请求间隔由限速器控制
+                results.append((article,) + self.render_with_retry(article))
+                if self.needs_recycle():
+                    self.recycle_driver()
+        
+        if self.writer:
+            # 渲染已全部结束，等待最后几个文件落盘后再写入清单
+            with self.report.span('write_flush'):
+                self.writer.flush()
+        
+        stats['rendered'] = len(results)
+        for article, filepath, page_hash in results:
+            if filepath and self.writer and self.writer.errors.pop(filepath, None):
+                # 写盘失败，错误已记入运行报告和任务检查点
+                stats['write_errors'] += 1
+                filepath = False
+            if not filepath:
+                stats['failed'] += 1
+                continue
+            stats['saved'] += 1
+            if self.manifest:
+                self.manifest.record(
+                    article['url'], article['title'],
+                    article.get('content_hash') or page_hash, filepath,
+                    etag=article.get('etag'), last_modified=article.get('last_modified')
+                )
+            if self.jobs:
+                self.jobs.advance(article['url'], WRITTEN)
+        if self.jobs:
+            remaining = self.jobs.prune()
+            if remaining:
+                print(f"\n{remaining} 篇文章重试后仍失败，下次运行时会再试")
+        return stats
     
     def run(self):
         """运行爬虫"""
@@ -289,76 +903,248 @@ class SCYSScraperAdvanced:
             print("  生财有术网站爬虫 - 改进版")
             print("="*70 + "\n")
             
-            print("步骤 1/4: 初始化浏览器...")
-            self.setup_driver(headless=False)
+            print("步骤 1/4: 初始化...")
+            # 本地检查cookies过期时间，TTL内复用上次结果，否则用一次HTTP请求探测
+            with self.report.span('login_check'):
+                probe = self.http.is_logged_in if self.use_http else None
+                use_browser = not (self.use_http and self.session_check.validate(probe))
+            if use_browser:
+                print("初始化浏览器...")
             
             print("\n步骤 2/4: 登录...")
-            cookies_loaded = self.load_cookies()
-            
-            if not cookies_loaded:
-                self.manual_login()
+            if use_browser:
+                self.ensure_driver()
             else:
-                # 验证登录状态
-                self.driver.get(self.base_url)
-                time.sleep(2)
-                
-                page_content = self.driver.page_source
-                if '登录' in page_content and '登出' not in page_content and '退出' not in page_content:
-                    print("⚠ 登录状态已过期，需要重新登录")
-                    self.manual_login()
-                else:
-                    print("✓ 登录状态有效")
+                print("✓ 登录状态有效（HTTP会话），生成PDF时再启动浏览器")
             
             print("\n步骤 3/4: 查找热门文章...")
-            articles = self.find_hot_articles()
+            if self.incremental:
+                self.manifest = Manifest(self.output_dir)
+            if self.resume:
+                self.jobs = JobQueue(self.output_dir)
+            if self.search_index:
+                self.index = SearchIndex(self.output_dir)
+            self.start_writer()
             
-            if not articles:
+            print(f"\n步骤 4/4: 边发现边下载并保存为PDF（最多 {self.max_articles} 篇）...")
+            print("-" * 70)
+            
+            stats = self.scrape_once()
+            
+            if not stats['found'] and not stats['resumed']:
+                self.save_debug_page()
                 print("\n✗ 未找到文章，请检查:")
                 print("  1. 网站结构是否发生变化")
                 print("  2. 是否正确登录")
                 print("  3. 查看 debug_page.html 了解页面结构")
                 return
+            if stats['resumed']:
+                print(f"\n从检查点继续了上次未完成的 {stats['resumed']} 篇文章")
+            if stats['skipped']:
+                print(f"\n清单中已有 {stats['skipped']} 篇文章未变化，处理了 {stats['rendered']} 篇")
             
-            print(f"\n✓ 找到 {len(articles)} 篇文章:\n")
-            for i, article in enumerate(articles, 1):
-                print(f"  {i}. {article['title'][:60]}")
-            
-            print(f"\n步骤 4/4: 开始下载并保存为PDF...")
-            print("-" * 70)
-            
-            success_count = 0
-            for i, article in enumerate(articles, 1):
-                print(f"\n[{i}/{len(articles)}] {article['title'][:50]}...")
-                
-                if self.save_page_as_pdf(article['url'], article['title'], i):
-                    success_count += 1
-                
-                # 避免请求过快
-                if i < len(articles):
-                    time.sleep(2)
-            
+            if stats['write_errors']:
+                print(f"\n✗ {stats['write_errors']} 个PDF写入磁盘失败，详见运行报告")
+            peak_mb = max((entry.get('rss_peak_mb') or 0
+                           for entry in self.report.summary()['articles'].values()), default=0)
+            if peak_mb:
+                print(f"\n浏览器内存峰值: {peak_mb:.0f} MB（上限 {self.recycle_rss_mb or '不限'} MB）")
+            success_count = stats['skipped'] + stats['saved']
+            total_count = success_count + stats['failed']
             print("\n" + "="*70)
-            print(f"  完成！成功保存 {success_count}/{len(articles)} 个PDF文件")
+            print(f"  完成！成功保存 {success_count}/{total_count} 个{self.output_format.upper()}文件")
             print(f"  保存位置: {os.path.abspath(self.output_dir)}/")
             print("="*70 + "\n")
             
         except KeyboardInterrupt:
             print("\n\n用户中断操作")
+            if self.jobs:
+                print("进度已保存，重新运行将从检查点继续")
+        except SessionExpired as e:
+            print(f"\n⚠ 登录状态已失效: {e}")
+            print("请删除 scys_cookies.json 后重新运行登录，未完成的文章会从检查点继续")
+            self.session_check.invalidate()
         except Exception as e:
             print(f"\n✗ 运行出错: {e}")
             import traceback
             traceback.print_exc()
         finally:
+            if self.writer:
+                # 中断时也把已渲染的PDF写完，检查点随之更新
+                self.writer.close()
+            self.http.close()
+            if self.manifest:
+                self.manifest.close()
+            if self.jobs:
+                self.jobs.close()
+            if self.index:
+                self.index.close()
+            try:
+                report_path = self.report.write(self.report.default_path(self.output_dir))
+                print(f"运行报告: {report_path}")
+            except Exception as e:
+                print(f"写入运行报告失败: {e}")
             if self.driver:
                 print("清理资源...")
+                self.close()
+    
+    def poll_once(self, pool, known):
+        """守护模式的一次轮询，返回本次发现的URL集合；登录失效时返回None"""
+        if self.http.logged_in is False:
+            # 上次轮询中HTTP请求被重定向到登录页
+            self.session_check.invalidate()
+        self.http.logged_in = None  # 会话常驻，缓存过期后需要重新探测
+        with self.report.span('login_check'):
+            probe = self.http.is_logged_in if self.use_http else None
+            session_ok = self.session_check.validate(probe)
+        if session_ok is False:
+            print("⚠ 登录状态已失效，请先以普通模式运行一次完成登录，下次轮询再试")
+            return None
+        
+        stats = self.scrape_once(pool=pool, known=known)
+        new = stats['found'] - stats['known']
+        print(f"本次轮询: 发现 {stats['found']} 篇，新条目 {new} 篇，"
+              f"未变化 {stats['skipped']} 篇，保存 {stats['saved']}/{stats['rendered']} 篇")
+        return stats['urls']
+    
+    def run_daemon(self, cycles=0):
+        """守护模式：保持浏览器和登录状态常驻，定期轮询热门列表，只渲染新出现的文章
+
+        cycles > 0 时只轮询指定次数（便于测试），否则一直运行到 Ctrl-C
+        """
+        print("\n" + "="*70)
+        print(f"  生财有术网站爬虫 - 守护模式（每 {self.poll_interval} 秒轮询一次）")
+        print("="*70 + "\n")
+        
+        self.headless = True
+        self.interactive = False
+        if self.incremental:
+            self.manifest = Manifest(self.output_dir)
+        if self.resume:
+            self.jobs = JobQueue(self.output_dir)
+        if self.search_index:
+            self.index = SearchIndex(self.output_dir)
+        self.start_writer()
+        
+        pool = None
+        known = None
+        cycle = 0
+        try:
+            if self.workers > 1:
+                # 常驻的工作池，每个worker达到页面数或内存上限后单独重建
+                with self.report.span('worker_startup'):
+                    pool = self.start_pool(self.workers)
+            
+            while True:
+                cycle += 1
+                started = time.monotonic()
+                print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] 第 {cycle} 次轮询")
+                print("-" * 70)
+                
+                self.report = RunReport('daemon')
+                if pool:
+                    for worker in pool.workers:
+                        worker.report = self.report
                 try:
-                    self.driver.quit()
-                except:
-                    pass
+                    urls = self.poll_once(pool, known)
+                    if urls:
+                        known = urls
+                except SessionExpired as e:
+                    print(f"⚠ 登录状态已失效: {e}，下次轮询再试")
+                    self.session_check.invalidate()
+                except Exception as e:
+                    print(f"✗ 本次轮询出错: {e}")
+                    import traceback
+                    traceback.print_exc()
+                
+                if self.needs_recycle():
+                    self.recycle_driver()
+                try:
+                    # 每次轮询覆盖同一个报告文件，长期运行不会堆积文件
+                    self.report.write(os.path.join(self.output_dir, 'run_report_daemon.json'))
+                except Exception as e:
+                    print(f"写入运行报告失败: {e}")
+                
+                if cycles and cycle >= cycles:
+                    break
+                wait = max(0.0, self.poll_interval - (time.monotonic() - started))
+                print(f"下次轮询: {wait:.0f} 秒后")
+                time.sleep(wait)
+        
+        except KeyboardInterrupt:
+            print("\n\n守护模式已停止")
+        finally:
+            if pool:
+                pool.close()
+            if self.writer:
+                self.writer.close()
+            self.http.close()
+            if self.manifest:
+                self.manifest.close()
+            if self.jobs:
+                self.jobs.close()
+            if self.index:
+                self.index.close()
+            self.close()
 
 def main():
     scraper = SCYSScraperAdvanced()
     scraper.run()
 
+def convert(argv=None):
+    """批量转换入口：python3 scrape_scys_advanced.py --convert [快照.mhtml ...] --workers 2"""
+    parser = argparse.ArgumentParser(description="把MHTML快照批量转换为PDF")
+    parser.add_argument('--convert', action='store_true')
+    parser.add_argument('paths', nargs='*', help="要转换的 .mhtml 文件，默认转换输出目录中的全部快照")
+    parser.add_argument('--output-dir', help="快照所在目录（默认 scys_pdfs）")
+    parser.add_argument('--workers', type=int, help="并行转换的无头浏览器数量")
+    parser.add_argument('--force', action='store_true', help="PDF已存在时也重新转换")
+    args = parser.parse_args(argv)
+    
+    scraper = SCYSScraperAdvanced(output_dir=args.output_dir or "scys_pdfs")
+    if args.workers:
+        scraper.workers = args.workers
+    try:
+        scraper.convert_snapshots(args.paths, force=args.force)
+    except KeyboardInterrupt:
+        print("\n\n用户中断操作")
+    finally:
+        if scraper.writer:
+            scraper.writer.close()
+        scraper.http.close()
+        try:
+            report_path = scraper.report.write(scraper.report.default_path(scraper.output_dir))
+            print(f"运行报告: {report_path}")
+        except Exception as e:
+            print(f"写入运行报告失败: {e}")
+
+def daemon(argv=None):
+    """守护模式入口：python3 scrape_scys_advanced.py --daemon --interval 600 --workers 2"""
+    parser = argparse.ArgumentParser(description="守护模式：定期轮询热门列表，只处理新文章")
+    parser.add_argument('--daemon', action='store_true')
+    parser.add_argument('--interval', type=float, help="轮询间隔（秒）")
+    parser.add_argument('--workers', type=int, help="常驻的无头浏览器数量")
+    parser.add_argument('--max-articles', type=int, help="每次轮询最多查看的文章数")
+    parser.add_argument('--format', choices=sorted(OUTPUT_EXTENSIONS), help="输出格式：pdf 或 mhtml")
+    parser.add_argument('--cycles', type=int, default=0, help="轮询次数，0表示一直运行")
+    args = parser.parse_args(argv)
+    
+    scraper = SCYSScraperAdvanced()
+    if args.interval:
+        scraper.poll_interval = args.interval
+    if args.workers:
+        scraper.workers = args.workers
+    if args.max_articles:
+        scraper.max_articles = args.max_articles
+    if args.format:
+        scraper.output_format = args.format
+    scraper.run_daemon(cycles=args.cycles)
+
 if __name__ == "__main__":
-    main()
+    import sys
+    if '--daemon' in sys.argv[1:]:
+        daemon()
+    elif '--convert' in sys.argv[1:]:
+        convert()
+    else:
+        main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+离线资源存储 - HTML归档中的图片下载到本地，按内容的SHA-256寻址
+
+很多文章共用相同的头像、横幅和图标。资源以内容哈希命名保存在
+scys_pdfs/assets/<哈希前两位>/<哈希><扩展名>，内容相同的只存一份；
+index.json 记录 URL → 文件 的映射，下载过的URL以后不再请求，
+重新渲染时完全离线。
+
+下载复用 HTTPFetcher 的 requests.Session（连接池 + keep-alive + 登录cookies）并发进行，
+与站点同域名的请求仍经过共用的限速器。
+"""
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+from scys_export import temp_file_for
+from scys_ratelimit import limited
+
+INDEX_FILENAME = "index.json"
+
+# 需要本地化的资源属性
+ASSET_ATTRIBUTES = (
+    ('img', 'src'), ('img', 'data-src'), ('img', 'data-original'), ('img', 'srcset'),
+    ('source', 'srcset'), ('video', 'poster'),
+)
+
+CONTENT_TYPE_EXTENSIONS = {
+    'image/png': '.png', 'image/jpeg': '.jpg', 'image/gif': '.gif', 'image/webp': '.webp',
+    'image/svg+xml': '.svg', 'image/avif': '.avif', 'image/x-icon': '.ico', 'image/bmp': '.bmp',
+}
+
+# 单个资源的大小上限，超过时保留原地址
+MAX_ASSET_BYTES = 20 * 1024 * 1024
+
+
+def parse_srcset(value):
+    """srcset 拆分为 [(url, 描述符)]"""
+    candidates = []
+    for item in value.split(','):
+        parts = item.strip().split(None, 1)
+        if parts:
+            candidates.append((parts[0], parts[1] if len(parts) > 1 else ''))
+    return candidates
+
+
+def _extension(url, content_type):
+    ext = CONTENT_TYPE_EXTENSIONS.get((content_type or '').split(';')[0].strip().lower())
+    if ext:
+        return ext
+    ext = os.path.splitext(urlsplit(url).path)[1].lower()
+    return ext if ext in CONTENT_TYPE_EXTENSIONS.values() or ext == '.jpeg' else ''
+
+
+class AssetStore:
+    """内容寻址的本地资源库，多个线程可以共用"""
+
+    def __init__(self, root, fetcher, workers=8):
+        self.root = root
+        self.fetcher = fetcher  # HTTPFetcher，提供带cookies的连接池Session和限速器
+        self.workers = workers  # 并发下载数，不超过Session连接池大小
+        self.index_path = os.path.join(root, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        try:
+            with open(self.index_path, 'r') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+        self._saved = json.dumps(self.index, sort_keys=True)
+
+    def lookup(self, url):
+        """已下载过的URL返回资源库中的相对路径，文件丢失时返回None"""
+        with self._lock:
+            relpath = self.index.get(url)
+        if relpath and os.path.exists(os.path.join(self.root, relpath)):
+            return relpath
+        return None
+
+    def put(self, data, url, content_type=None):
+        """按内容哈希保存，返回相对路径；相同内容已存在时不再写入"""
+        digest = hashlib.sha256(data).hexdigest()
+        relpath = os.path.join(digest[:2], digest + _extension(url, content_type))
+        path = os.path.join(self.root, relpath)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            f, tmp_path = temp_file_for(path)
+            with f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        with self._lock:
+            self.index[url] = relpath
+        return relpath
+
+    def download(self, url):
+        """下载一个资源，返回 (相对路径或None, 下载的字节数)"""
+        same_site = urlsplit(url).netloc == urlsplit(self.fetcher.base_url).netloc
+        try:
+            with limited(self.fetcher.limiter if same_site else None) as slot:
+                response = self.fetcher.session.get(url, timeout=self.fetcher.timeout)
+                slot.report(status=response.status_code, url=response.url)
+        except Exception as e:
+            print(f"  资源下载失败: {url} ({e})")
+            return None, 0
+        content_type = response.headers.get('Content-Type', '')
+        if response.status_code != 200 or 'html' in content_type:
+            return None, 0
+        data = response.content
+        if len(data) > MAX_ASSET_BYTES:
+            return None, 0
+        return self.put(data, url, content_type), len(data)
+
+    def fetch_all(self, urls):
+        """返回 ({url: 相对路径}, 统计)，未缓存的URL并发下载"""
+        paths = {}
+        missing = []
+        for url in urls:
+            relpath = self.lookup(url)
+            if relpath:
+                paths[url] = relpath
+            else:
+                missing.append(url)
+
+        stats = {'cached': len(paths), 'downloaded': 0, 'failed': 0, 'bytes': 0}
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(missing)))) as executor:
+                for url, (relpath, size) in zip(missing, executor.map(self.download, missing)):
+                    if relpath:
+                        paths[url] = relpath
+                        stats['downloaded'] += 1
+                        stats['bytes'] += size
+                    else:
+                        stats['failed'] += 1
+        return paths, stats
+
+    def localize_html(self, html, page_url, html_dir):
+        """把HTML片段中的资源地址改写为相对 html_dir 的本地路径，返回 (新HTML, 统计)
+
+        下载失败的资源保留原地址；懒加载图片（data-src）同时写入 src，离线打开也能显示
+        """
+        import lxml.html
+
+        root = lxml.html.fragment_fromstring(html, create_parent='div')
+        refs = []
+        for tag, attr in ASSET_ATTRIBUTES:
+            for element in root.iter(tag):
+                value = element.get(attr)
+                if not value:
+                    continue
+                raw = [url for url, _ in parse_srcset(value)] if attr == 'srcset' else [value.strip()]
+                for url in raw:
+                    if not url.startswith('data:'):
+                        refs.append(urljoin(page_url, url))
+
+        paths, stats = self.fetch_all(dict.fromkeys(refs))
+        stats['assets'] = len(refs)
+        local = {
+            url: os.path.relpath(os.path.join(self.root, relpath), html_dir).replace(os.sep, '/')
+            for url, relpath in paths.items()
+        }
+
+        for tag, attr in ASSET_ATTRIBUTES:
+            for element in root.iter(tag):
+                value = element.get(attr)
+                if not value:
+                    continue
+                if attr == 'srcset':
+                    element.set(attr, ', '.join(
+                        ' '.join(filter(None, (local.get(urljoin(page_url, url), url), descriptor)))
+                        for url, descriptor in parse_srcset(value)
+                    ))
+                    continue
+                target = local.get(urljoin(page_url, value.strip()))
+                if not target:
+                    continue
+                element.set(attr, target)
+                if attr != 'src' and tag == 'img' and (
+                        not element.get('src') or element.get('src').startswith('data:')):
+                    element.set('src', target)
+
+        self.save_index()
+        inner_html = (root.text or '') + ''.join(
+            lxml.html.tostring(child, encoding='unicode') for child in root
+        )
+        return inner_html, stats
+
+    def save_index(self):
+        """索引有变化时原子写回"""
+        with self._lock:
+            snapshot = json.dumps(self.index, sort_keys=True)
+            if snapshot == self._saved:
+                return
+            tmp_path = self.index_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.index_path)
+            self._saved = snapshot
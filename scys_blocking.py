@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+资源拦截 - 用 CDP Network.setBlockedURLs 屏蔽与归档PDF无关的请求
+
+统计脚本、广告追踪、网页字体、视频和第三方挂件不会出现在PDF里，却占用大部分加载时间和流量。
+拦截在浏览器内部完成，被拦截的请求会以 Network.loadingFailed（blockedReason='inspector'）
+出现在performance日志中，由 PageReadiness 统计每个页面拦截的请求数。
+
+策略：
+  off      不拦截
+  default  拦截追踪/统计/挂件域名，以及字体和音视频（保留图片、样式、脚本）
+  images   在default基础上再拦截样式和脚本，只保留文档本身和图片（适合服务端渲染的正文）
+
+说明：Fetch.requestPaused 是事件，需要持续监听的CDP连接，Selenium的 execute_cdp_cmd
+只能发送命令，所以这里按资源类型常见的URL后缀生成匹配规则。
+"""
+
+# 追踪、统计、广告和第三方挂件
+DEFAULT_BLOCKLIST = (
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*googlesyndication.com*', '*facebook.net*', '*hotjar.com*', '*clarity.ms*',
+    '*hm.baidu.com*', '*cnzz.com*', '*umeng.com*', '*growingio.com*',
+    '*sensorsdata*', '*zhugeio.com*', '*mixpanel.com*', '*segment.io*',
+    '*intercom.io*', '*intercomcdn.com*', '*crisp.chat*', '*tawk.to*',
+    '*youtube.com/embed*', '*player.bilibili.com*', '*player.youku.com*',
+    '*/gtag/js*', '*/analytics.js*', '*/ga.js*',
+)
+
+# 各资源类型对应的URL规则（setBlockedURLs 的 * 匹配任意字符，需要同时覆盖带查询参数的情况）
+RESOURCE_EXTENSIONS = {
+    'font': ('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'media': ('mp4', 'webm', 'm3u8', 'ts', 'mp3', 'ogg', 'mov', 'flv', 'm4a'),
+    'stylesheet': ('css',),
+    'script': ('js', 'mjs'),
+    'image': ('png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico', 'avif', 'bmp'),
+}
+
+# 每种策略允许加载的资源类型
+POLICY_ALLOW_TYPES = {
+    'default': ('image', 'stylesheet', 'script'),
+    'images': ('image',),
+}
+
+
+def patterns_for_type(resource_type):
+    """资源类型对应的URL匹配规则"""
+    patterns = []
+    for ext in RESOURCE_EXTENSIONS[resource_type]:
+        patterns.append(f'*.{ext}')
+        patterns.append(f'*.{ext}?*')
+    return patterns
+
+
+class ResourcePolicy:
+    """一组要拦截的URL规则
+
+    blocklist 为额外的URL规则；allow_types 为允许加载的资源类型，
+    RESOURCE_EXTENSIONS 中其余类型全部拦截；allow_types=None 表示不按类型拦截。
+    """
+
+    def __init__(self, blocklist=DEFAULT_BLOCKLIST, allow_types=None):
+        self.blocklist = tuple(blocklist)
+        self.allow_types = None if allow_types is None else tuple(allow_types)
+
+    @classmethod
+    def from_name(cls, name, extra_blocklist=()):
+        """按策略名创建，name 为 off / default / images"""
+        if not name or name == 'off':
+            return cls(blocklist=extra_blocklist)
+        if name not in POLICY_ALLOW_TYPES:
+            raise ValueError(f"未知的资源拦截策略: {name}")
+        return cls(tuple(DEFAULT_BLOCKLIST) + tuple(extra_blocklist), POLICY_ALLOW_TYPES[name])
+
+    @property
+    def blocked_types(self):
+        if self.allow_types is None:
+            return ()
+        return tuple(t for t in RESOURCE_EXTENSIONS if t not in self.allow_types)
+
+    def patterns(self):
+        patterns = list(self.blocklist)
+        for resource_type in self.blocked_types:
+            patterns.extend(patterns_for_type(resource_type))
+        return patterns
+
+    def apply(self, driver):
+        """在浏览器上启用拦截，返回规则数量；对之后所有页面生效"""
+        patterns = self.patterns()
+        if not patterns:
+            return 0
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        return len(patterns)
+
+    @staticmethod
+    def clear(driver):
+        """取消拦截（例如手动登录时，登录页可能依赖第三方脚本）"""
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+
+    def describe(self):
+        types = ', '.join(self.blocked_types) or '无'
+        return f"{len(self.blocklist)} 条域名规则，拦截资源类型: {types}"
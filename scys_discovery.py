@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+文章发现 - 一次 execute_script 取回页面上所有链接的快照
+
+以前每个链接都要单独调用 get_attribute('href') 和 .text，每次都是一次
+chromedriver HTTP往返。现在由页面内的JS一次性收集所有 <a> 的信息，
+各种查找策略都在Python里对快照进行过滤。
+
+iter_html_pages / iter_browser_pages 把快照扩展到多页：沿"下一页"链接翻页，
+浏览器通道还会滚动到底部触发无限加载，每一批新链接产出一次，调用方可以边发现边处理。
+
+HTTP通道用 lxml.etree 的HTML解析器（C实现）解析一次，选择器预编译后在各页之间复用；
+rank_links 在一次遍历中为快照里的链接打分，按得分排序产出候选文章。
+"""
+from functools import lru_cache
+from urllib.parse import urljoin, urlsplit
+
+# 分页链接（下一页），自动追加到调用方的选择器列表末尾
+NEXT_PAGE_XPATH = (
+    "//a[@rel='next' or contains(@class, 'next') or contains(text(), '下一页') "
+    "or contains(text(), '加载更多')]"
+)
+
+# 滚动到页面底部，返回滚动后的页面高度
+SCROLL_TO_BOTTOM_JS = """
+window.scrollTo(0, document.body.scrollHeight);
+return document.body.scrollHeight;
+"""
+
+# arguments[0]: 需要匹配的链接XPath列表，命中的下标写入每个链接的 matches
+# arguments[1]: 容器XPath（如热门区域），arguments[2]: 只取前N个容器，命中的容器下标写入 sections
+# arguments[3]: 跳过文档顺序中的前N个链接（滚动加载后只取新增的部分）
+LINK_SNAPSHOT_JS = """
+var selectors = arguments[0] || [];
+var containerXPath = arguments[1] || null;
+var containerLimit = arguments[2] || 0;
+var offset = arguments[3] || 0;
+
+function evaluate(xpath) {
+    var result = document.evaluate(xpath, document, null,
+        XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var nodes = [];
+    for (var i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+    return nodes;
+}
+
+var anchors = Array.prototype.slice.call(document.getElementsByTagName('a'));
+var info = new Map();
+anchors.forEach(function (a) { info.set(a, {matches: [], sections: []}); });
+
+selectors.forEach(function (xpath, index) {
+    try {
+        evaluate(xpath).forEach(function (node) {
+            var data = info.get(node);
+            if (data) data.matches.push(index);
+        });
+    } catch (e) {}
+});
+
+if (containerXPath) {
+    try {
+        evaluate(containerXPath).slice(0, containerLimit).forEach(function (section, index) {
+            section.querySelectorAll('a').forEach(function (a) {
+                var data = info.get(a);
+                if (data && data.sections.indexOf(index) === -1) data.sections.push(index);
+            });
+        });
+    } catch (e) {}
+}
+
+return anchors.slice(offset).map(function (a) {
+    var data = info.get(a);
+    return {
+        href: a.href || '',
+        raw_href: a.getAttribute('href') || '',
+        text: (a.innerText || '').trim(),
+        text_content: (a.textContent || '').trim(),
+        matches: data.matches,
+        sections: data.sections
+    };
+});
+"""
+
+
+# 打分：位于前N个热门区域（按区域顺序）> 标题类链接 > 兜底链接（候选不够时补足）
+SECTION_SCORES = (30, 20, 10)
+MATCH_SCORE = 5
+FALLBACK_SCORE = 1
+# 兜底链接排除的地址
+EXCLUDED_PATH_WORDS = ('login', 'register', 'about', 'help')
+
+
+def snapshot_links(driver, selectors=(), container_xpath=None, container_limit=0, offset=0):
+    """一次往返取回页面所有链接的 href / 可见文本 / 命中的选择器和容器"""
+    return driver.execute_script(
+        LINK_SNAPSHOT_JS, list(selectors), container_xpath, container_limit, offset
+    ) or []
+
+
+@lru_cache(maxsize=64)
+def compiled_xpath(xpath):
+    """预编译的XPath，同一表达式在各页之间复用；表达式无效时返回None"""
+    from lxml import etree
+    try:
+        return etree.XPath(xpath)
+    except etree.XPathSyntaxError:
+        return None
+
+
+def _select(xpath, doc):
+    query = compiled_xpath(xpath)
+    if query is None:
+        return []
+    try:
+        return query(doc)
+    except Exception:
+        return []
+
+
+def _url_joiner(base_url):
+    """返回把相对地址补全为绝对地址的函数，常见的 /path 和 http(s):// 形式不经过 urljoin"""
+    parts = urlsplit(base_url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+
+    def join(raw_href):
+        if raw_href.startswith(('http://', 'https://')):
+            return raw_href
+        if raw_href.startswith('/') and not raw_href.startswith('//'):
+            return origin + raw_href
+        return urljoin(base_url, raw_href)
+    return join
+
+
+def snapshot_links_from_html(html, base_url, selectors=(), container_xpath=None, container_limit=0):
+    """对服务端HTML生成与 snapshot_links 相同结构的链接快照（用于HTTP通道）
+
+    只解析一次；选择器和容器各执行一次预编译查询，其余信息在一次遍历所有 <a> 时得到
+    """
+    from lxml import etree
+
+    doc = etree.HTML(html)
+    if doc is None:
+        return []
+
+    matches = {}
+    for index, xpath in enumerate(selectors):
+        for node in _select(xpath, doc):
+            matches.setdefault(node, []).append(index)
+
+    sections = {}
+    if container_xpath:
+        for index, section in enumerate(_select(container_xpath, doc)[:container_limit]):
+            for a in section.iter('a'):
+                found = sections.setdefault(a, [])
+                if index not in found:
+                    found.append(index)
+
+    join = _url_joiner(base_url)
+    links = []
+    for a in doc.iter('a'):
+        raw_href = a.get('href') or ''
+        text = ' '.join(''.join(a.itertext()).split())
+        links.append({
+            'href': join(raw_href) if raw_href else '',
+            'raw_href': raw_href,
+            'text': text,
+            'text_content': text,
+            'matches': matches.get(a, []),
+            'sections': sections.get(a, []),
+        })
+    return links
+
+
+def link_score(link, match_index=0):
+    """链接作为热门文章的得分，0表示不是候选（只能作为兜底）"""
+    if not link['href'] or len(link['text']) <= 5:
+        return 0
+    score = 0
+    for section in link['sections']:
+        if section < len(SECTION_SCORES):
+            score = max(score, SECTION_SCORES[section])
+    if match_index in link['matches']:
+        score = max(score, MATCH_SCORE)
+    return score
+
+
+def is_fallback_link(link, site_host):
+    """兜底规则：站内地址、文本足够长、不是登录/注册/关于/帮助页面"""
+    href = link['raw_href']
+    return bool(
+        href and len(link['text_content']) > 10
+        and (site_host in href or href.startswith('/'))
+        and not any(word in href.lower() for word in EXCLUDED_PATH_WORDS)
+    )
+
+
+def rank_links(links, base_url, match_index=0):
+    """一次遍历为链接打分，返回按得分从高到低排列的 [(标题, URL)]
+
+    同分按页面顺序，同一URL只保留得分最高的一次；兜底链接按页面顺序排在所有候选之后，
+    候选不够时由它补足，数量由调用方截断。
+    match_index 为标题类链接选择器在快照 matches 中的下标
+    """
+    site_host = urlsplit(base_url).netloc
+    join = _url_joiner(base_url)
+    scored = []
+    fallback = []
+    for position, link in enumerate(links):
+        score = link_score(link, match_index)
+        if score:
+            scored.append((-score, position, link['text'], link['href']))
+        elif is_fallback_link(link, site_host):
+            fallback.append((-FALLBACK_SCORE, position, link['text_content'], join(link['raw_href'])))
+
+    ranked = []
+    seen = set()
+    for _, _, title, url in sorted(scored) + fallback:
+        if url not in seen:
+            seen.add(url)
+            ranked.append((title, url))
+    return ranked
+
+
+def next_page_url(links, next_index, visited):
+    """从快照中找出第一个未访问过的"下一页"链接"""
+    for link in links:
+        href = link['href']
+        if next_index in link['matches'] and href.startswith('http') and href not in visited:
+            return href
+    return None
+
+
+def iter_html_pages(fetch_html, start_url, selectors=(), container_xpath=None,
+                    container_limit=0, max_pages=1):
+    """HTTP通道：从start_url开始沿"下一页"链接翻页，每页产出一次链接快照
+
+    NEXT_PAGE_XPATH 追加在 selectors 之后，下标为 len(selectors)。
+    只保留已访问URL集合，快照产出后即可释放，内存不随页数增长。
+    """
+    selectors = list(selectors) + [NEXT_PAGE_XPATH]
+    next_index = len(selectors) - 1
+    visited = set()
+    url = start_url
+    while url and len(visited) < max_pages:
+        visited.add(url)
+        html = fetch_html(url)
+        if not html:
+            return
+        links = snapshot_links_from_html(html, url, selectors, container_xpath, container_limit)
+        yield links
+        url = next_page_url(links, next_index, visited)
+
+
+def iter_browser_pages(driver, open_page, start_url, selectors=(), container_xpath=None,
+                       container_limit=0, max_pages=1, max_scrolls=0, settle=None):
+    """浏览器通道：每页先产出首屏链接，再滚动到底部最多max_scrolls次，
+    每次只产出新出现的链接；页面高度不再变化时翻到下一页
+
+    open_page(url) 负责打开页面并等待就绪，settle() 在每次滚动后等待新内容加载。
+    """
+    selectors = list(selectors) + [NEXT_PAGE_XPATH]
+    next_index = len(selectors) - 1
+    visited = set()
+    url = start_url
+    while url and len(visited) < max_pages:
+        visited.add(url)
+        open_page(url)
+        offset = 0
+        next_url = None
+        height = None
+        for scroll in range(max_scrolls + 1):
+            links = snapshot_links(driver, selectors, container_xpath, container_limit, offset)
+            offset += len(links)
+            next_url = next_url or next_page_url(links, next_index, visited)
+            if links:
+                yield links
+            if scroll == max_scrolls:
+                break
+            new_height = driver.execute_script(SCROLL_TO_BOTTOM_JS)
+            if new_height == height:
+                break
+            height = new_height
+            if settle:
+                settle()
+        url = next_url
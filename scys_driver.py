@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+chromedriver 路径缓存 - 启动浏览器时不再每次联网检查版本
+
+ChromeDriverManager().install() 每次都会请求版本接口，离线环境下要等超时才回退。
+这里按本机Chrome的主版本号缓存已解析的chromedriver路径：
+
+  1. 环境变量 SCYS_CHROMEDRIVER 指定的路径
+  2. 缓存中与当前Chrome主版本一致、且文件仍然存在的路径
+  3. PATH 中主版本一致的 chromedriver
+  4. 以上都没有时才调用 webdriver_manager 下载，并写入缓存；下载失败也会记录，
+     INSTALL_RETRY_SECONDS 内不再重试。设置环境变量 SCYS_OFFLINE 时从不下载
+
+Chrome版本本身也按可执行文件的修改时间缓存，命中时不启动任何子进程。
+全部失败时返回None，由Selenium自带的 Selenium Manager 处理。
+"""
+import os
+import re
+import json
+import time
+import shutil
+import subprocess
+
+CACHE_FILE = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'scys', 'chromedriver.json'
+)
+
+CHROME_BINARIES = (
+    'google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+)
+
+VERSION_PATTERN = re.compile(r'(\d+)\.\d+\.\d+(?:\.\d+)?')
+
+# Chrome主版本未知时 drivers 缓存使用的键
+UNKNOWN_MAJOR = 'unknown'
+
+# 下载失败后多长时间内不再尝试（秒），离线环境不必每次启动都等网络超时
+INSTALL_RETRY_SECONDS = 6 * 3600
+
+
+def _load_cache():
+    try:
+        with open(CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache, original=None):
+    """缓存有变化时才写回"""
+    if original is not None and json.dumps(cache, sort_keys=True) == original:
+        return
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        tmp_path = CACHE_FILE + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, CACHE_FILE)
+    except OSError:
+        pass
+
+
+def _run_version(binary):
+    """执行 `binary --version` 返回完整版本号，失败时返回None"""
+    try:
+        output = subprocess.run(
+            [binary, '--version'], capture_output=True, text=True, timeout=5
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output or '')
+    return match.group(0) if match else None
+
+
+def find_chrome():
+    """本机Chrome/Chromium可执行文件路径"""
+    for name in CHROME_BINARIES:
+        path = name if os.path.isabs(name) else shutil.which(name)
+        if path and os.path.exists(path):
+            return os.path.realpath(path)
+    return None
+
+
+def _cached_version(cache, binary):
+    """按可执行文件的修改时间缓存版本号，浏览器升级后自动失效"""
+    try:
+        stamp = os.path.getmtime(binary)
+    except OSError:
+        return None
+    versions = cache.setdefault('versions', {})
+    entry = versions.get(binary)
+    if entry and entry.get('mtime') == stamp:
+        return entry['version']
+    version = _run_version(binary)
+    if version:
+        versions[binary] = {'mtime': stamp, 'version': version}
+    return version
+
+
+def major(version):
+    return version.split('.', 1)[0] if version else None
+
+
+def resolve_chromedriver(install=True):
+    """返回与本机Chrome匹配的chromedriver路径，热路径上不访问网络
+
+    install=False 时缓存未命中也不下载，直接返回None
+    """
+    override = os.environ.get('SCYS_CHROMEDRIVER')
+    if override and os.path.exists(override):
+        return override
+
+    cache = _load_cache()
+    original = json.dumps(cache, sort_keys=True)
+    chrome = find_chrome()
+    chrome_major = major(_cached_version(cache, chrome)) if chrome else None
+
+    # 找不到Chrome或读不出版本时，用固定的键缓存上次下载的路径，避免每次启动都联网
+    key = chrome_major or UNKNOWN_MAJOR
+    drivers = cache.setdefault('drivers', {})
+    path = drivers.get(key)
+    if path and os.path.exists(path):
+        _save_cache(cache, original)
+        return path
+
+    # PATH 中的chromedriver，主版本一致时直接使用
+    system_driver = shutil.which('chromedriver')
+    if system_driver:
+        system_driver = os.path.realpath(system_driver)
+        driver_major = major(_cached_version(cache, system_driver))
+        if driver_major and (chrome_major is None or driver_major == chrome_major):
+            drivers[chrome_major or driver_major] = system_driver
+            _save_cache(cache, original)
+            return system_driver
+
+    path = None
+    failures = cache.setdefault('failures', {})
+    if os.environ.get('SCYS_OFFLINE'):
+        install = False
+    elif time.time() - failures.get(key, 0) < INSTALL_RETRY_SECONDS:
+        # 最近下载失败过（多半是离线），直接交给 Selenium Manager
+        install = False
+    if install:
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+        except Exception as e:
+            print(f"下载chromedriver失败: {e}")
+        if path:
+            drivers[key] = path
+            failures.pop(key, None)
+        else:
+            failures[key] = time.time()
+    _save_cache(cache, original)
+    return path
+
+
+def chrome_service(install=True):
+    """创建使用缓存chromedriver的 Service；路径未知时交给 Selenium Manager 解析"""
+    from selenium.webdriver.chrome.service import Service
+
+    path = resolve_chromedriver(install)
+    return Service(path) if path else Service()
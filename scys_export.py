@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+导出工具 - 以流的方式把 Page.printToPDF 的结果写入磁盘
+
+printToPDF 使用 transferMode='ReturnAsStream' 后只返回一个流句柄，
+再通过 IO.read 分块读取，每块解码后立即写入临时文件，完成后原子重命名，
+内存占用与PDF大小无关。
+
+capture_mhtml 用 Page.captureSnapshot 把页面连同图片、样式保存为单个MHTML文件，
+不做分页排版，比 printToPDF 便宜得多；需要PDF时再批量转换。
+
+WriteBehind 把写盘移到后台线程：渲染线程把数据块放入按字节数限额的队列后立即返回，
+继续渲染下一篇；写线程写入临时文件并原子重命名，失败记录在 errors 中。
+队列中待写的数据超过限额时渲染线程等待（背压），内存不会无限增长。
+"""
+import os
+import time
+import queue
+import base64
+import secrets
+import threading
+from contextlib import nullcontext
+
+# 每次 IO.read 读取的字节数
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# 写线程队列中最多积压的字节数
+WRITE_BEHIND_BYTES = 64 * 1024 * 1024
+
+
+def temp_file_for(filepath):
+    """在目标文件同一目录下创建临时文件（保证 os.replace 是原子操作），返回 (文件对象, 临时路径)
+
+    不用 tempfile.mkstemp：它固定以0600创建，重命名后归档文件只有自己可读。
+    这里按0666创建、由umask决定最终权限，与直接 open(filepath, 'wb') 一致。
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        tmp_path = os.path.join(directory, f".{secrets.token_hex(6)}.part")
+        try:
+            fd = os.open(tmp_path, flags, 0o666)
+        except FileExistsError:
+            continue
+        return os.fdopen(fd, 'wb'), tmp_path
+
+
+def _read_stream(driver, result, chunk_size):
+    """逐块产出 printToPDF 结果的字节"""
+    stream = result.get('stream')
+    if not stream:
+        # 旧版本Chrome忽略transferMode，仍然一次性返回base64数据
+        yield base64.b64decode(result['data'])
+        return
+    while True:
+        chunk = driver.execute_cdp_cmd('IO.read', {'handle': stream, 'size': chunk_size})
+        data = chunk.get('data', '')
+        if data:
+            if chunk.get('base64Encoded'):
+                yield base64.b64decode(data)
+            else:
+                yield data.encode('utf-8')
+        if chunk.get('eof'):
+            return
+
+
+class PendingFile:
+    """交给写线程的一个输出文件；write/commit/abort 由渲染线程调用，实际写盘在写线程中进行"""
+
+    def __init__(self, writer, filepath, tag=None):
+        self.writer = writer
+        self.filepath = filepath
+        self.tag = tag  # 调用方附带的信息（如文章URL），在 on_complete 回调中使用
+        self.written = 0
+        self.seconds = 0.0  # 写线程中实际花在写盘上的时间
+        self.error = None
+        self._f = None
+        self._tmp_path = None
+
+    def write(self, data):
+        self.writer.submit(lambda: self._write(data), len(data))
+
+    def commit(self):
+        """所有数据写完后原子重命名为目标文件"""
+        self.writer.submit(self._commit)
+
+    def abort(self):
+        """放弃这个文件（例如渲染中途出错），删除临时文件"""
+        self.writer.submit(self._discard)
+
+    def _write(self, data):
+        if self.error:
+            return
+        start = time.perf_counter()
+        try:
+            if self._f is None:
+                self._f, self._tmp_path = temp_file_for(self.filepath)
+            self._f.write(data)
+            self.written += len(data)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self._discard()
+        self.seconds += time.perf_counter() - start
+
+    def _commit(self):
+        start = time.perf_counter()
+        if not self.error:
+            try:
+                if self._f is None:
+                    self._f, self._tmp_path = temp_file_for(self.filepath)
+                self._f.close()
+                os.replace(self._tmp_path, self.filepath)
+                self._f = None
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                self._discard()
+        self.seconds += time.perf_counter() - start
+        self.writer._finished(self)
+
+    def _discard(self):
+        if self._f is not None:
+            try:
+                self._f.close()
+            except OSError:
+                pass
+            self._f = None
+        if self._tmp_path:
+            try:
+                os.remove(self._tmp_path)
+            except OSError:
+                pass
+            self._tmp_path = None
+
+
+class WriteBehind:
+    """后台写盘线程，多个渲染线程可以共用
+
+    on_complete(pending) 在写线程中于每个文件提交后调用（成功或失败），
+    失败的文件同时记录在 errors（输出路径 → 错误信息）中
+    """
+
+    def __init__(self, max_pending_bytes=WRITE_BEHIND_BYTES, on_complete=None):
+        self.max_pending_bytes = max_pending_bytes
+        self.on_complete = on_complete
+        self.errors = {}
+        self.completed = 0
+        self._queue = queue.Queue()
+        self._pending_bytes = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+        return self
+
+    def open(self, filepath, tag=None):
+        return PendingFile(self, filepath, tag)
+
+    def write_bytes(self, filepath, data, tag=None):
+        """整块数据写入filepath（如fpdf生成的PDF）"""
+        pending = self.open(filepath, tag)
+        pending.write(data)
+        pending.commit()
+        return pending
+
+    def submit(self, fn, nbytes=0):
+        """把写盘操作放入队列；积压的字节数超过上限时等待写线程消化"""
+        with self._cond:
+            # 队列为空时总是放行，单块超过上限也不会死锁
+            while self._pending_bytes and self._pending_bytes + nbytes > self.max_pending_bytes:
+                self._cond.wait()
+            self._pending_bytes += nbytes
+        self._queue.put((fn, nbytes))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                fn, nbytes = item
+                try:
+                    fn()
+                except Exception as e:
+                    print(f"写线程出错: {e}")
+                finally:
+                    with self._cond:
+                        self._pending_bytes -= nbytes
+                        self._cond.notify_all()
+            finally:
+                self._queue.task_done()
+
+    def _finished(self, pending):
+        if pending.error:
+            self.errors[pending.filepath] = pending.error
+            print(f"✗ 写入失败: {pending.filepath} ({pending.error})")
+        else:
+            self.completed += 1
+        if self.on_complete:
+            try:
+                self.on_complete(pending)
+            except Exception as e:
+                print(f"写入回调出错: {e}")
+
+    def flush(self):
+        """等待队列中已提交的写操作全部完成"""
+        self._queue.join()
+
+    def close(self):
+        """写完剩余数据后停止写线程"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+
+def print_to_pdf(driver, filepath, pdf_settings, chunk_size=STREAM_CHUNK_SIZE, span=None,
+                 writer=None, tag=None):
+    """打印当前页面为PDF并流式写入filepath，返回写入的字节数
+
+    span(stage) 可选，返回计时用的上下文管理器，分别统计 print_to_pdf 和 disk_write 两个阶段。
+    传入 writer（WriteBehind）时读出的数据块交给写线程，函数在数据读完后立即返回，
+    此时文件可能尚未落盘；耗时计入 pdf_stream 阶段，写盘结果通过 writer 回调报告
+    """
+    span = span or (lambda stage: nullcontext())
+    settings = dict(pdf_settings, transferMode='ReturnAsStream')
+    with span('print_to_pdf'):
+        result = driver.execute_cdp_cmd('Page.printToPDF', settings)
+    stream = result.get('stream')
+
+    if writer is not None:
+        pending = writer.open(filepath, tag)
+        written = 0
+        try:
+            with span('pdf_stream'):
+                for data in _read_stream(driver, result, chunk_size):
+                    pending.write(data)
+                    written += len(data)
+        except Exception:
+            pending.abort()
+            raise
+        finally:
+            if stream:
+                try:
+                    driver.execute_cdp_cmd('IO.close', {'handle': stream})
+                except Exception:
+                    pass
+        pending.commit()
+        return written
+
+    f, tmp_path = temp_file_for(filepath)
+    written = 0
+    try:
+        with span('disk_write'), f:
+            for data in _read_stream(driver, result, chunk_size):
+                f.write(data)
+                written += len(data)
+        os.replace(tmp_path, filepath)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        if stream:
+            try:
+                driver.execute_cdp_cmd('IO.close', {'handle': stream})
+            except Exception:
+                pass
+
+    return written
+
+
+def capture_mhtml(driver, filepath, span=None, writer=None, tag=None):
+    """把当前页面保存为MHTML单文件归档，返回写入的字节数
+
+    传入 writer 时写盘交给写线程，参数含义与 print_to_pdf 相同
+    """
+    span = span or (lambda stage: nullcontext())
+    with span('capture_snapshot'):
+        data = driver.execute_cdp_cmd('Page.captureSnapshot', {'format': 'mhtml'})['data']
+    data = data.encode('utf-8')
+
+    if writer is not None:
+        writer.write_bytes(filepath, data, tag)
+        return len(data)
+
+    f, tmp_path = temp_file_for(filepath)
+    try:
+        with span('disk_write'), f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(data)
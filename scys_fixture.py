@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+本地测试站点 - 模拟生财有术网站结构，用于离线基准测试
+
+- /?page=<n>        首页，登录后包含"热门"区域和文章链接（每页page_size篇，带"下一页"链接），
+                    未登录时只有"登录"按钮
+- /login            设置登录cookie并跳回首页
+- /articles/<id>    文章页（需要登录），段落数和图片数可配置，部分图片为懒加载；
+                    validators=True 时带 ETag / Last-Modified，条件请求未变化时返回304，
+                    revise(id) 模拟文章被编辑
+- /img/<id>_<k>.png 随机噪声PNG图片，大小可配置
+- /static/...       asset_size > 0 时文章页额外引用网页字体、统计脚本和视频（用于测试资源拦截）
+
+用法：
+    site = FixtureSite(articles=50).start()
+    site.write_cookies('bench_cookies.json')
+    ...  # base_url = site.url
+    site.stop()
+"""
+import json
+import random
+import hashlib
+import struct
+import threading
+import zlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+SESSION_COOKIE = 'scys_session'
+SESSION_VALUE = 'fixture-logged-in'
+
+
+def make_png(width, height, seed=0):
+    """生成随机噪声PNG（几乎不可压缩，体积约为 width*height*3 字节）"""
+    rng = random.Random(seed)
+    rows = b''.join(b'\x00' + rng.randbytes(width * 3) for _ in range(height))
+
+    def chunk(tag, data):
+        return (struct.pack('>I', len(data)) + tag + data
+                + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(rows, 1)) + chunk(b'IEND', b''))
+
+
+class FixtureSite:
+    """在后台线程中运行的假站点"""
+
+    def __init__(self, articles=20, paragraphs=30, images=4, image_size=128,
+                 latency=0.0, page_size=20, asset_size=0, validators=True, host='127.0.0.1', port=0):
+        self.articles = articles
+        self.page_size = page_size
+        self.asset_size = asset_size  # 每个字体/脚本/视频资源的字节数，0表示不引用
+        self.paragraphs = paragraphs
+        self.images = images
+        self.image_size = image_size
+        self.latency = latency  # 每个请求额外增加的延迟（秒）
+        self.validators = validators  # 文章页是否支持 ETag / Last-Modified 条件请求
+        self.revisions = {}  # 文章ID → 编辑次数
+        self.modified = {}  # 文章ID → 最后编辑时间
+        self.started_at = time.time()
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.not_modified = 0  # 返回304的次数
+        self._server = None
+        self._thread = None
+        self._image = make_png(image_size, image_size)
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    def title(self, article_id):
+        return f"热门文章第{article_id}篇：如何用副业实现稳定的被动收入"
+
+    def revise(self, article_id):
+        """模拟文章被编辑：正文末尾增加一段，ETag 和 Last-Modified 随之变化"""
+        self.revisions[article_id] = self.revisions.get(article_id, 0) + 1
+        self.modified[article_id] = time.time()
+
+    def render_home(self, logged_in, page=1):
+        if not logged_in:
+            return ("<html><head><title>生财有术</title></head><body>"
+                    "<header><a href='/login'>登录</a></header>"
+                    "<main><p>请先登录</p></main></body></html>")
+        first = (page - 1) * self.page_size + 1
+        last = min(self.articles, page * self.page_size)
+        items = ''.join(
+            f"<li class='list-item'><a class='post-title' href='/articles/{i}'>{self.title(i)}</a></li>"
+            for i in range(first, last + 1)
+        )
+        pager = f"<a rel='next' href='/?page={page + 1}'>下一页</a>" if last < self.articles else ""
+        return ("<html><head><title>生财有术</title></head><body>"
+                "<header><a href='/about'>关于我们</a> <a href='/logout'>退出</a></header>"
+                "<section class='feed'><h2>热门</h2>"
+                f"<div class='hot-list'><ul>{items}</ul></div></section>"
+                f"<nav class='pager'>{pager}</nav>"
+                "</body></html>")
+
+    def render_article(self, article_id):
+        # 图片均匀插在段落之间，奇数序号的图片使用懒加载
+        step = max(1, self.paragraphs // max(1, self.images))
+        parts = []
+        for p in range(self.paragraphs):
+            parts.append(
+                f"<p>第{p + 1}段：这是用于基准测试的正文内容，包含中文字符和一些English words，"
+                f"用来模拟真实文章的排版和长度。文章编号 {article_id}。</p>"
+            )
+            k = p // step
+            if p % step == 0 and k < self.images:
+                lazy = " loading='lazy'" if k % 2 else ""
+                parts.append(
+                    f"<img src='/img/{article_id}_{k}.png' width='{self.image_size}'"
+                    f" height='{self.image_size}'{lazy}>"
+                )
+        if self.revisions.get(article_id):
+            parts.append(f"<p>第{self.revisions[article_id]}次修订。</p>")
+        assets = ""
+        if self.asset_size:
+            assets = ("<style>@font-face{font-family:'Fixture';src:url('/static/fixture.woff2')}"
+                      "body{font-family:'Fixture',sans-serif}</style>"
+                      "<script src='/static/analytics.js'></script>")
+            parts.append("<video src='/static/intro.mp4' preload='auto' muted></video>")
+        return ("<html><head><meta charset='utf-8'>"
+                f"<title>{self.title(article_id)}</title>{assets}</head><body>"
+                "<header><a href='/logout'>退出</a></header>"
+                f"<h1>{self.title(article_id)}</h1>"
+                f"<article class='post-content'>{''.join(parts)}</article>"
+                "</body></html>")
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _logged_in(self):
+                return f"{SESSION_COOKIE}={SESSION_VALUE}" in (self.headers.get('Cookie') or '')
+
+            def _send(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+                if isinstance(body, str):
+                    body = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _not_modified(self, etag, modified):
+                """If-None-Match 优先，没有时才比较 If-Modified-Since"""
+                if_none_match = self.headers.get('If-None-Match')
+                if if_none_match:
+                    return etag in [tag.strip() for tag in if_none_match.split(',')]
+                if_modified_since = self.headers.get('If-Modified-Since')
+                if if_modified_since:
+                    try:
+                        return int(modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+                    except (TypeError, ValueError):
+                        return False
+                return False
+
+            def _redirect(self, location, headers=None):
+                self.send_response(302)
+                self.send_header('Location', location)
+                self.send_header('Content-Length', '0')
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+
+            def do_GET(self):
+                site.requests += 1
+                if site.latency:
+                    time.sleep(site.latency)
+
+                path, _, query = self.path.partition('?')
+                if path == '/':
+                    page = parse_qs(query).get('page', ['1'])[0]
+                    page = int(page) if page.isdigit() and int(page) > 0 else 1
+                    self._send(200, site.render_home(self._logged_in(), page))
+                elif path == '/login':
+                    self._redirect('/', {'Set-Cookie': f"{SESSION_COOKIE}={SESSION_VALUE}; Path=/"})
+                elif path.startswith('/articles/'):
+                    if not self._logged_in():
+                        self._redirect('/login')
+                        return
+                    try:
+                        article_id = int(path.rsplit('/', 1)[1])
+                    except ValueError:
+                        article_id = 0
+                    if not 1 <= article_id <= site.articles:
+                        self._send(404, "<html><body>not found</body></html>")
+                        return
+                    body = site.render_article(article_id)
+                    if not site.validators:
+                        self._send(200, body)
+                        return
+                    etag = '"' + hashlib.sha1(body.encode('utf-8')).hexdigest()[:16] + '"'
+                    modified = site.modified.get(article_id, site.started_at)
+                    if self._not_modified(etag, modified):
+                        site.not_modified += 1
+                        self.send_response(304)
+                        self.send_header('ETag', etag)
+                        self.end_headers()
+                        return
+                    self._send(200, body, headers={'ETag': etag,
+                                                   'Last-Modified': formatdate(modified, usegmt=True)})
+                elif path.startswith('/static/') and site.asset_size:
+                    content_type = {'js': 'application/javascript', 'woff2': 'font/woff2',
+                                    'mp4': 'video/mp4'}.get(path.rsplit('.', 1)[-1], 'application/octet-stream')
+                    body = b'//' + b'x' * (site.asset_size - 2) if content_type.endswith('javascript') \
+                        else bytes(site.asset_size)
+                    self._send(200, body, content_type, {'Cache-Control': 'no-store'})
+                elif path.startswith('/img/'):
+                    self._send(200, site._image, 'image/png',
+                               {'Cache-Control': 'no-store'})
+                else:
+                    self._send(404, "<html><body>not found</body></html>")
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def write_cookies(self, path):
+        """写出与 scys_cookies.json 相同格式的登录cookies"""
+        with open(path, 'w') as f:
+            json.dump([{'name': SESSION_COOKIE, 'value': SESSION_VALUE, 'path': '/'}], f, indent=2)
+        return path
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="启动本地测试站点")
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--articles', type=int, default=20)
+    args = parser.parse_args()
+
+    site = FixtureSite(articles=args.articles, port=args.port).start()
+    print(f"测试站点已启动: {site.url}  (访问 {site.url}login 登录)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        site.stop()
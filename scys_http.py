@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+HTTP快速通道 - 用保存的cookies直接请求HTML，不启动浏览器
+
+列表发现和纯文本导出只需要HTML，用 requests.Session（连接池 + keep-alive）
+直接获取，速度从秒级降到毫秒级。服务端渲染的HTML缺少内容时返回None，
+由调用方自动回退到Selenium。
+
+已归档的文章用条件请求（If-None-Match / If-Modified-Since）检查是否变化，
+服务端支持时未变化的文章只返回一个没有正文的304响应。
+"""
+import os
+import json
+import threading
+from scys_ratelimit import limited, parse_retry_after
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# 文章正文的候选区域，按优先级排列
+CONTENT_XPATHS = [
+    "//article",
+    "//div[contains(@class, 'content')]",
+    "//div[contains(@class, 'article')]",
+    "//div[contains(@class, 'post-content')]",
+    "//main",
+    "//body"
+]
+
+
+def is_logged_in_html(html):
+    """根据页面中的登录/退出字样判断是否已登录"""
+    return not ('登录' in html and '登出' not in html and '退出' not in html)
+
+
+def extract_article_from_html(html, content_xpaths=CONTENT_XPATHS):
+    """从HTML中提取 {'title', 'content', 'html'}，找不到正文时返回None"""
+    import lxml.html
+
+    try:
+        doc = lxml.html.fromstring(html)
+    except Exception:
+        return None
+
+    content_element = None
+    for xpath in content_xpaths:
+        elements = doc.xpath(xpath)
+        if elements:
+            content_element = elements[0]
+            break
+
+    if content_element is None:
+        return None
+
+    # 获取文章标题
+    headings = doc.xpath('//h1')
+    if headings:
+        title = headings[0].text_content().strip()
+    else:
+        titles = doc.xpath('//title')
+        title = titles[0].text_content().strip() if titles else ""
+
+    # innerHTML：元素自身的文本加所有子节点
+    inner_html = (content_element.text or '') + ''.join(
+        lxml.html.tostring(child, encoding='unicode') for child in content_element
+    )
+
+    return {
+        'title': title,
+        'content': content_element.text_content().strip(),
+        'html': inner_html
+    }
+
+
+class HTTPFetcher:
+    """基于 requests.Session 的HTML抓取器，cookies来自 scys_cookies.json"""
+
+    def __init__(self, base_url, cookies_file, timeout=15, pool_size=10, min_content_chars=200,
+                 limiter=None):
+        self.base_url = base_url
+        self.cookies_file = cookies_file
+        self.limiter = limiter  # 与浏览器通道共用的 AdaptiveRateLimiter
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.min_content_chars = min_content_chars  # 正文少于该字数视为服务端未渲染
+        self.logged_in = None
+        self._session = None
+        self._session_lock = threading.Lock()  # 图片下载等线程池会同时首次访问session
+
+    @property
+    def session(self):
+        """首次使用时才创建Session（连接池 + keep-alive），并发首次访问时只创建一个"""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update({
+                    'User-Agent': USER_AGENT,
+                    'Accept-Language': 'zh-CN,zh;q=0.9',
+                })
+                self._session = session
+                self.load_cookies()
+            return self._session
+
+    def available(self):
+        """有保存的cookies时才能走HTTP通道"""
+        return os.path.exists(self.cookies_file)
+
+    def load_cookies(self):
+        """从cookies文件（Selenium get_cookies格式）加载到Session"""
+        if self._session is None or not self.available():
+            return False
+        try:
+            with open(self.cookies_file, 'r') as f:
+                cookies = json.load(f)
+        except Exception as e:
+            print(f"HTTP会话加载cookies失败: {e}")
+            return False
+
+        self._session.cookies.clear()
+        for cookie in cookies:
+            try:
+                self._session.cookies.set(
+                    cookie['name'], cookie['value'],
+                    domain=cookie.get('domain', ''),
+                    path=cookie.get('path', '/')
+                )
+            except Exception:
+                continue
+        self.logged_in = None
+        return True
+
+    def _get(self, url, headers=None):
+        """经过限速器的GET请求，失败或被重定向到登录页时返回None"""
+        if not self.available():
+            return None
+        try:
+            with limited(self.limiter) as slot:
+                response = self.session.get(url, timeout=self.timeout, headers=headers)
+                slot.report(
+                    status=response.status_code,
+                    url=response.url,
+                    retry_after=parse_retry_after(response.headers.get('Retry-After'))
+                )
+        except Exception as e:
+            print(f"HTTP请求失败: {e}")
+            return None
+
+        if 'login' in response.url.lower():
+            # 被重定向到登录页，cookies已失效
+            self.logged_in = False
+            return None
+        return response
+
+    def fetch_html(self, url):
+        """获取页面HTML，失败或被重定向到登录页时返回None"""
+        response = self._get(url)
+        if response is None or response.status_code != 200:
+            return None
+        if 'html' not in response.headers.get('Content-Type', 'text/html'):
+            return None
+        return response.text
+
+    def is_logged_in(self):
+        """用一次首页请求判断cookies是否仍然有效"""
+        if self.logged_in is None:
+            html = self.fetch_html(self.base_url)
+            self.logged_in = bool(html) and is_logged_in_html(html)
+        return self.logged_in
+
+    def get_article_content(self, url):
+        """直接请求文章HTML并提取正文，内容不完整时返回None"""
+        html = self.fetch_html(url)
+        if not html:
+            return None
+        data = extract_article_from_html(html)
+        if not data or len(data['content']) < self.min_content_chars:
+            return None
+        data['url'] = url
+        return data
+
+    def probe_article(self, url, etag=None, last_modified=None):
+        """带上次记录的校验值条件请求文章，请求失败时返回None，否则返回字典：
+
+          not_modified   服务端返回304，正文与上次相同
+          data           200时提取的正文（同 get_article_content，内容不完整时为None）
+          etag / last_modified  本次响应的校验值（304时沿用原值），下次请求时带上
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        response = self._get(url, headers)
+        if response is None:
+            return None
+        result = {
+            'not_modified': response.status_code == 304,
+            'data': None,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        if result['not_modified']:
+            result['etag'] = result['etag'] or etag
+            result['last_modified'] = result['last_modified'] or last_modified
+            return result
+        if response.status_code != 200 or 'html' not in response.headers.get('Content-Type', 'text/html'):
+            return None
+        data = extract_article_from_html(response.text)
+        if data and len(data['content']) >= self.min_content_chars:
+            data['url'] = url
+            result['data'] = data
+        return result
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+任务检查点 - 中断（Ctrl-C、浏览器崩溃、登录失效）后重新运行时从断点继续
+
+每篇文章是一条任务，按以下状态推进，每次状态变化都立即写入输出目录下的 SQLite 数据库：
+
+  discovered  已在热门列表中发现
+  fetched     已完成增量检查，确定了输出路径和正文哈希
+  rendered    PDF已生成到磁盘
+  written     已写入清单，任务完成
+  failed      重试次数用完仍失败，下次运行时再试
+
+一批任务全部完成后清除 written 记录；重新运行时先处理上次未完成的任务，
+已生成PDF的直接写入清单，不再打开浏览器。
+"""
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+
+from scys_manifest import canonical_url
+
+JOBS_FILENAME = "jobs.sqlite3"
+
+DISCOVERED = 'discovered'
+FETCHED = 'fetched'
+RENDERED = 'rendered'
+WRITTEN = 'written'
+FAILED = 'failed'
+
+
+def backoff_delay(attempt, base=2.0, cap=60.0):
+    """第attempt次重试前的等待秒数：指数增长、有上限，加随机抖动避免多个worker同时重试"""
+    delay = min(cap, base * (2 ** (attempt - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class JobQueue:
+    """持久化的文章任务队列，多个worker线程可以共用"""
+
+    def __init__(self, output_dir, filename=JOBS_FILENAME):
+        self.path = os.path.join(output_dir, filename)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                url TEXT PRIMARY KEY,
+                position INTEGER,
+                state TEXT,
+                attempts INTEGER DEFAULT 0,
+                data TEXT,
+                last_error TEXT,
+                updated_at REAL
+            )
+        """)
+        self.conn.commit()
+
+    def add(self, article):
+        """登记新发现的文章，返回True；已有未完成的同一篇任务时返回False"""
+        with self._lock:
+            position = self.conn.execute("SELECT COALESCE(MAX(position), 0) + 1 FROM jobs").fetchone()[0]
+            cursor = self.conn.execute("""
+                INSERT INTO jobs (url, position, state, attempts, data, updated_at)
+                VALUES (?, ?, ?, 0, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    state = excluded.state,
+                    attempts = 0,
+                    data = excluded.data,
+                    last_error = NULL,
+                    updated_at = excluded.updated_at
+                WHERE jobs.state = 'written'
+            """, (canonical_url(article['url']), position, DISCOVERED,
+                  json.dumps(article, ensure_ascii=False), time.time()))
+            self.conn.commit()
+            return cursor.rowcount > 0
+
+    def get(self, url):
+        """按URL查询任务，不存在时返回None；任务状态在返回值的 'job' 键中"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM jobs WHERE url = ?", (canonical_url(url),)
+            ).fetchone()
+        return self._article(row) if row else None
+
+    def advance(self, url, state, fields=None):
+        """推进到新状态，fields（字典）合并进任务保存的文章信息"""
+        key = canonical_url(url)
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM jobs WHERE url = ?", (key,)).fetchone()
+            if row is None:
+                return
+            data = json.loads(row['data'])
+            data.update(fields or {})
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, data = ?, last_error = NULL, updated_at = ? WHERE url = ?",
+                (state, json.dumps(data, ensure_ascii=False), time.time(), key)
+            )
+            self.conn.commit()
+
+    def fail(self, url, error, final=False):
+        """记录一次失败；final=True 表示本次运行不再重试"""
+        with self._lock:
+            self.conn.execute(f"""
+                UPDATE jobs SET attempts = attempts + 1, last_error = ?, updated_at = ?
+                    {", state = 'failed'" if final else ''}
+                WHERE url = ?
+            """, (str(error) if error else None, time.time(), canonical_url(url)))
+            self.conn.commit()
+
+    def pending(self):
+        """上次运行未完成的任务（含失败的），按发现顺序"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM jobs WHERE state != 'written' ORDER BY position"
+            ).fetchall()
+        return [self._article(row) for row in rows]
+
+    def counts(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state").fetchall()
+        return {row['state']: row['n'] for row in rows}
+
+    def prune(self):
+        """清除已完成的任务，返回剩余（失败）任务数"""
+        with self._lock:
+            self.conn.execute("DELETE FROM jobs WHERE state = 'written'")
+            self.conn.commit()
+            return self.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _article(row):
+        article = json.loads(row['data'])
+        article['job'] = {'state': row['state'], 'attempts': row['attempts'], 'last_error': row['last_error']}
+        return article
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+懒加载内容处理 - 打印PDF前让页面上的所有图片真正加载出来
+
+原来的做法是滚动到底部、等待、再回到顶部：长文章中间的懒加载图片从未进入视口，
+PDF里是空白；短页面也要白白等一轮。现在分两步：
+
+  1. 注入脚本把懒加载图片改为立即加载：loading="lazy" 改为 eager，
+     data-src / data-original 等属性写回 src，data-srcset 写回 srcset
+  2. 仍有图片未完成时（自定义的滚动监听加载器），按视口高度逐屏滚动，
+     当前屏的图片加载完就立即滚动下一屏，所有图片都加载完成时提前结束
+
+短页面和没有懒加载图片的页面不滚动，直接返回。
+"""
+import time
+
+# 常见懒加载库使用的属性 → 真实属性
+LAZY_ATTRIBUTES = (
+    ('data-src', 'src'), ('data-original', 'src'), ('data-lazy-src', 'src'), ('data-url', 'src'),
+    ('data-srcset', 'srcset'), ('data-lazy-srcset', 'srcset'),
+)
+
+# 把懒加载图片改为立即加载，返回修改的图片数
+EAGER_LOAD_JS = """
+var attrs = arguments[0];
+var forced = 0;
+var nodes = document.querySelectorAll('img, source, iframe');
+for (var i = 0; i < nodes.length; i++) {
+    var el = nodes[i];
+    var changed = false;
+    if (el.loading === 'lazy' || el.getAttribute('loading') === 'lazy') {
+        el.setAttribute('loading', 'eager');
+        changed = true;
+    }
+    for (var j = 0; j < attrs.length; j++) {
+        var value = el.getAttribute(attrs[j][0]);
+        if (!value || value.indexOf('data:') === 0) continue;
+        var current = el.getAttribute(attrs[j][1]) || '';
+        if (current !== value && (current === '' || current.indexOf('data:') === 0 ||
+                                  current.indexOf('placeholder') !== -1 || current.indexOf('blank') !== -1)) {
+            el.setAttribute(attrs[j][1], value);
+            changed = true;
+        }
+    }
+    if (changed) forced++;
+}
+return forced;
+"""
+
+# 图片加载状态：全部未完成数、当前视口内未完成数、页面和视口高度
+IMAGE_STATE_JS = """
+var pending = 0, visible = 0;
+var viewport = window.innerHeight || document.documentElement.clientHeight;
+for (var i = 0; i < document.images.length; i++) {
+    var img = document.images[i];
+    if (img.complete || !img.currentSrc && !img.getAttribute('src')) continue;
+    pending++;
+    var rect = img.getBoundingClientRect();
+    if (rect.bottom > 0 && rect.top < viewport) visible++;
+}
+return {
+    pending: pending,
+    visible: visible,
+    height: Math.max(document.body ? document.body.scrollHeight : 0,
+                     document.documentElement.scrollHeight),
+    viewport: viewport
+};
+"""
+
+
+def _image_state(driver):
+    try:
+        return driver.execute_script(IMAGE_STATE_JS) or {}
+    except Exception:
+        return {}
+
+
+def _wait_images(driver, deadline, key, poll_interval):
+    """等待 state[key] 降到0或到达deadline，返回最后的状态"""
+    state = _image_state(driver)
+    while state.get(key, 0) and time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        state = _image_state(driver)
+    return state
+
+
+def resolve_lazy_content(driver, timeout=10, step_timeout=2.0, poll_interval=0.1):
+    """让页面上的图片全部加载，返回统计字典
+
+    统计字段：forced 改为立即加载的元素数，steps 滚动的屏数，
+    pending 结束时仍未加载的图片数，seconds 耗时
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    try:
+        forced = driver.execute_script(EAGER_LOAD_JS, [list(pair) for pair in LAZY_ATTRIBUTES]) or 0
+    except Exception:
+        forced = 0
+
+    # 改为立即加载的图片多数不需要滚动就会开始下载，先给一个屏的等待时间
+    state = _wait_images(driver, min(deadline, time.monotonic() + step_timeout), 'pending', poll_interval)
+    steps = 0
+    if state.get('pending') and state.get('height', 0) > state.get('viewport', 0) > 0:
+        # 剩下的图片依赖滚动监听：逐屏滚动，当前屏加载完就继续
+        position = 0
+        height, viewport = state['height'], state['viewport']
+        while position < height and time.monotonic() < deadline:
+            position += viewport
+            driver.execute_script("window.scrollTo(0, arguments[0]);", position)
+            steps += 1
+            state = _wait_images(driver, min(deadline, time.monotonic() + step_timeout), 'visible',
+                                 poll_interval)
+            if not state.get('pending'):
+                break
+            # 页面可能随滚动继续变长
+            height = state.get('height', height)
+        driver.execute_script("window.scrollTo(0, 0);")
+        state = _wait_images(driver, deadline, 'pending', poll_interval)
+
+    return {
+        'forced': forced,
+        'steps': steps,
+        'pending': state.get('pending', 0),
+        'seconds': round(time.monotonic() - start, 3),
+    }
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+浏览器生命周期 - 长时间运行时把Chrome的内存控制在固定上限以内
+
+同一个浏览器连续打开几百篇文章后，渲染进程的内存只增不减，小容器里最终会被OOM杀掉。
+这里用三层手段控制：
+
+  1. 换标签页：同一个标签页导航 tab_pages 次后打开新标签页并关闭旧的，
+     旧的渲染进程随之退出（cookies 在浏览器级别共享，不需要重新登录）
+  2. 重启浏览器：累计加载 max_pages 个页面，或进程树RSS超过 ceiling_mb 时，
+     由调用方关闭浏览器，下次需要时重新启动并通过CDP恢复登录状态
+  3. 记录内存：每篇文章处理期间采样RSS，峰值写入运行报告
+
+RSS 优先从 /proc 统计 chromedriver 及其所有Chrome子进程；没有 /proc 的系统（macOS）
+退回到CDP Performance.getMetrics 的JS堆大小，只能作为下限参考。
+"""
+from contextlib import contextmanager
+
+from scys_metrics import process_tree_rss
+
+MB = 1024 * 1024
+
+
+def browser_memory(driver):
+    """浏览器进程树的RSS（字节），返回 (字节数, 来源)；都取不到时返回 (0, None)"""
+    try:
+        rss = process_tree_rss(driver.service.process.pid)
+    except Exception:
+        rss = 0
+    if rss:
+        return rss, 'proc'
+    try:
+        driver.execute_cdp_cmd('Performance.enable', {})
+        metrics = driver.execute_cdp_cmd('Performance.getMetrics', {}).get('metrics', [])
+        heap = sum(m['value'] for m in metrics if m.get('name') == 'JSHeapTotalSize')
+        return int(heap), 'cdp'
+    except Exception:
+        return 0, None
+
+
+def fresh_tab(driver):
+    """打开一个新标签页并关闭其余所有标签页，返回新标签页的句柄"""
+    old_handles = list(driver.window_handles)
+    driver.switch_to.new_window('tab')
+    handle = driver.current_window_handle
+    for old in old_handles:
+        try:
+            driver.switch_to.window(old)
+            driver.close()
+        except Exception:
+            pass
+    driver.switch_to.window(handle)
+    return handle
+
+
+@contextmanager
+def scratch_tab(driver):
+    """在临时标签页中执行，结束时（包括出错时）关闭它并切回原标签页"""
+    original = driver.current_window_handle
+    driver.switch_to.new_window('tab')
+    try:
+        yield driver.current_window_handle
+    finally:
+        try:
+            driver.close()
+        except Exception:
+            pass
+        driver.switch_to.window(original)
+
+
+class BrowserLifecycle:
+    """跟踪一个浏览器的导航次数和内存，决定何时换标签页、何时重启"""
+
+    def __init__(self, tab_pages=0, max_pages=0, ceiling_mb=0, on_new_tab=None):
+        self.tab_pages = tab_pages      # 同一标签页导航多少次后换新标签页，0表示不换
+        self.max_pages = max_pages      # 浏览器累计加载多少个页面后重启，0表示不限制
+        self.ceiling_mb = ceiling_mb    # 进程树RSS上限（MB），超过后重启，0表示不限制
+        self.on_new_tab = on_new_tab    # 换标签页后调用，用于重新设置按标签页生效的CDP状态（资源拦截）
+        self.driver = None
+        self.pages = 0
+        self.tab_navigations = 0
+        self.tabs_recycled = 0
+        self.last_rss = 0
+        self.peak_rss = 0          # 整个运行期间的峰值，跨浏览器重启保留
+        self.source = None
+        self._article_peak = 0
+
+    def attach(self, driver):
+        """开始跟踪新启动的浏览器"""
+        self.driver = driver
+        self.pages = 0
+        self.tab_navigations = 0
+        self.last_rss = 0
+
+    def detach(self):
+        self.driver = None
+        self.pages = 0
+        self.tab_navigations = 0
+
+    def before_navigation(self):
+        """每次导航前调用；当前标签页导航次数用完时换新标签页，返回是否换过"""
+        recycled = False
+        if self.driver and self.tab_pages and self.tab_navigations >= self.tab_pages:
+            fresh_tab(self.driver)
+            if self.on_new_tab:
+                self.on_new_tab()
+            self.tab_navigations = 0
+            self.tabs_recycled += 1
+            recycled = True
+        self.pages += 1
+        self.tab_navigations += 1
+        return recycled
+
+    def sample(self):
+        """采样一次浏览器内存，更新当前文章和整个运行的峰值"""
+        if not self.driver:
+            return 0
+        self.last_rss, self.source = browser_memory(self.driver)
+        self._article_peak = max(self._article_peak, self.last_rss)
+        self.peak_rss = max(self.peak_rss, self.last_rss)
+        return self.last_rss
+
+    def article_peak(self):
+        """返回上次调用以来的内存峰值（字节）并重新开始计算，用于每篇文章的高水位"""
+        peak, self._article_peak = self._article_peak, 0
+        return peak
+
+    def restart_reason(self):
+        """需要重启浏览器时返回原因，否则返回None；使用最近一次采样，不额外扫描进程"""
+        if not self.driver:
+            return None
+        if self.max_pages and self.pages >= self.max_pages:
+            return f"已加载 {self.pages} 个页面"
+        if self.ceiling_mb and self.last_rss > self.ceiling_mb * MB:
+            return f"内存 {self.last_rss / MB:.0f} MB 超过上限 {self.ceiling_mb} MB"
+        return None
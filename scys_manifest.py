@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+增量抓取清单 - 记录已归档的文章，重复运行时只处理新增或变化的文章
+
+清单保存在输出目录下的 SQLite 数据库中，以规范化后的文章URL为主键，
+记录内容哈希、最后一次看到的时间、输出文件路径，以及服务端返回的 ETag / Last-Modified
+（下次检查时用条件请求，未变化的文章只需要一个304响应）。
+"""
+import os
+import re
+import time
+import sqlite3
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+MANIFEST_FILENAME = "manifest.sqlite3"
+
+# 不影响文章内容的跟踪参数
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'spm', 'from', 'share', 'ref'}
+
+
+def canonical_url(url):
+    """规范化URL：小写域名、去掉锚点和跟踪参数、参数排序、去掉结尾斜杠"""
+    parts = urlsplit(url.strip())
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not (k.lower().startswith(TRACKING_PARAM_PREFIXES) or k.lower() in TRACKING_PARAMS)
+    ]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ''))
+
+
+def content_hash(text, source='text'):
+    """正文内容哈希，忽略空白差异；source 标明提取方式，不同方式的哈希互不比较"""
+    normalized = re.sub(r'\s+', ' ', text or '').strip()
+    return f"{source}:" + hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def url_key(url):
+    """URL的短哈希，用于避免文件名冲突"""
+    return hashlib.sha256(canonical_url(url).encode('utf-8')).hexdigest()[:8]
+
+
+class Manifest:
+    """已归档文章清单"""
+
+    def __init__(self, output_dir, filename=MANIFEST_FILENAME):
+        self.path = os.path.join(output_dir, filename)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                content_hash TEXT,
+                output_path TEXT,
+                first_seen REAL,
+                last_seen REAL,
+                rendered_at REAL,
+                etag TEXT,
+                last_modified TEXT
+            )
+        """)
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(articles)")}
+        for column in ('etag', 'last_modified'):
+            if column not in columns:
+                # 旧版本创建的清单
+                self.conn.execute(f"ALTER TABLE articles ADD COLUMN {column} TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_output ON articles(output_path)")
+        self.conn.commit()
+
+    def get(self, url):
+        """按URL查询清单记录，不存在时返回None"""
+        row = self.conn.execute(
+            "SELECT * FROM articles WHERE url = ?", (canonical_url(url),)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def owner_of(self, output_path):
+        """返回占用该输出文件的文章URL"""
+        row = self.conn.execute(
+            "SELECT url FROM articles WHERE output_path = ?", (output_path,)
+        ).fetchone()
+        return row['url'] if row else None
+
+    def is_unchanged(self, url, new_hash):
+        """文章已归档、输出文件仍在且内容哈希相同"""
+        entry = self.get(url)
+        return bool(
+            entry and new_hash
+            and entry['content_hash'] == new_hash
+            and entry['output_path'] and os.path.exists(entry['output_path'])
+        )
+
+    def output_path_for(self, url, title, index, output_dir, ext='.pdf'):
+        """已知文章沿用原来的文件名（扩展名换成ext）；新文章使用 {序号}_{标题}{ext}，冲突时追加URL短哈希"""
+        entry = self.get(url)
+        if entry and entry['output_path']:
+            return os.path.splitext(entry['output_path'])[0] + ext
+
+        safe_title = re.sub(r'[<>:"/\\|?*]', '', title)[:80]
+        path = os.path.join(output_dir, f"{index:02d}_{safe_title}{ext}")
+        owner = self.owner_of(path)
+        if owner and owner != canonical_url(url):
+            path = os.path.join(output_dir, f"{index:02d}_{safe_title}_{url_key(url)}{ext}")
+        return path
+
+    def touch(self, url, etag=None, last_modified=None):
+        """更新最后一次看到的时间，服务端返回了新的校验值时一并更新"""
+        self.conn.execute("""
+            UPDATE articles SET last_seen = ?,
+                etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+            WHERE url = ?
+        """, (time.time(), etag, last_modified, canonical_url(url)))
+        self.conn.commit()
+
+    def record(self, url, title, new_hash, output_path, etag=None, last_modified=None):
+        """记录一次成功的渲染；校验值只在 new_hash 来自服务端HTML时有意义"""
+        now = time.time()
+        self.conn.execute("""
+            INSERT INTO articles (url, title, content_hash, output_path, first_seen, last_seen, rendered_at,
+                                  etag, last_modified)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                title = excluded.title,
+                content_hash = excluded.content_hash,
+                output_path = excluded.output_path,
+                last_seen = excluded.last_seen,
+                rendered_at = excluded.rendered_at,
+                etag = excluded.etag,
+                last_modified = excluded.last_modified
+        """, (canonical_url(url), title, new_hash, output_path, now, now, now, etag, last_modified))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+运行耗时统计 - 轻量的分阶段计时和JSON运行报告
+
+用法：
+    report = RunReport('advanced')
+    with report.span('page_load', article=url):
+        ...
+    report.write('scys_pdfs/run_report_xxx.json')
+
+报告包含每个阶段的 count / total / p50 / p95 / max，以及每篇文章各阶段的耗时、
+CDP Performance.getMetrics 指标和网络字节数。多个worker线程可以共用一个报告。
+"""
+import os
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+# 从 Performance.getMetrics 中保留的指标
+PAGE_METRICS = (
+    'Documents', 'Frames', 'Nodes', 'JSHeapUsedSize', 'JSHeapTotalSize',
+    'LayoutDuration', 'RecalcStyleDuration', 'ScriptDuration', 'TaskDuration',
+)
+
+
+def percentile(values, pct):
+    """最近秩法百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def collect_page_metrics(driver):
+    """读取当前页面的 CDP Performance 指标，失败时返回空字典"""
+    try:
+        driver.execute_cdp_cmd('Performance.enable', {})
+        result = driver.execute_cdp_cmd('Performance.getMetrics', {})
+    except Exception:
+        return {}
+    return {
+        item['name']: item['value']
+        for item in result.get('metrics', [])
+        if item.get('name') in PAGE_METRICS
+    }
+
+
+class RunReport:
+    """一次运行的分阶段耗时记录"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.stages = {}
+        self.marks = {}
+        self.articles = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage, article=None):
+        """记录一个阶段的耗时，article 不为空时同时计入该文章"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, article)
+
+    def mark(self, name):
+        """记录某个时间点距报告创建的秒数，只记录第一次（如 first_navigation）"""
+        with self._lock:
+            if name not in self.marks:
+                self.marks[name] = round(time.perf_counter() - self._started, 4)
+    
+    def timed_iter(self, stage, iterable):
+        """逐项产出iterable，每次取下一项的耗时计入stage（用于流式发现等生成器）"""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(stage, time.perf_counter() - start)
+                return
+            self.add(stage, time.perf_counter() - start)
+            yield item
+    
+    def add(self, stage, seconds, article=None):
+        with self._lock:
+            self.stages.setdefault(stage, []).append(seconds)
+            if article is not None:
+                entry = self.articles.setdefault(article, {'stages': {}})
+                entry['stages'][stage] = entry['stages'].get(stage, 0.0) + seconds
+
+    def annotate(self, article, **info):
+        """为文章附加信息（标题、结果、页面指标、网络字节数等）"""
+        with self._lock:
+            self.articles.setdefault(article, {'stages': {}}).update(info)
+
+    def summary(self):
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': len(values),
+                    'total': round(sum(values), 4),
+                    'p50': round(percentile(values, 50), 4),
+                    'p95': round(percentile(values, 95), 4),
+                    'max': round(max(values), 4),
+                }
+                for stage, values in self.stages.items()
+            }
+            articles = {}
+            for key, entry in self.articles.items():
+                entry = dict(entry)
+                entry['total'] = round(sum(entry['stages'].values()), 4)
+                entry['stages'] = {k: round(v, 4) for k, v in entry['stages'].items()}
+                articles[key] = entry
+
+        totals = [entry['total'] for entry in articles.values()]
+        return {
+            'name': self.name,
+            'started_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at)),
+            'wall_time': round(time.time() - self.started_at, 4),
+            'marks': dict(self.marks),
+            'stages': stages,
+            'article_totals': {
+                'count': len(totals),
+                'p50': round(percentile(totals, 50), 4),
+                'p95': round(percentile(totals, 95), 4),
+                'max': round(max(totals), 4) if totals else 0.0,
+            },
+            'articles': articles,
+        }
+
+    def write(self, path):
+        """写入JSON报告"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def default_path(self, output_dir):
+        stamp = time.strftime('%Y%m%d_%H%M%S', time.localtime(self.started_at))
+        return os.path.join(output_dir, f"run_report_{stamp}.json")
+
+
+def _process_rss(pid):
+    """单个进程的RSS（字节），进程不存在时返回0"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def process_tree_rss(pid=None):
+    """进程及其所有子进程（chromedriver、Chrome各进程）的RSS总和（字节），仅支持Linux"""
+    pid = pid or os.getpid()
+    children = {}
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return 0
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total += _process_rss(current)
+        stack.extend(children.get(current, []))
+    return total
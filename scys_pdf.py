@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+文本PDF - 用fpdf排版文章正文（基础版使用）
+
+fpdf和fontTools导入较慢，只有真正生成PDF时才导入本模块；
+进程池中的每个worker各自导入一次，并预先解析中文字体。
+"""
+import os
+import copy
+import time
+from fpdf import FPDF
+
+from scys_export import temp_file_for
+
+# 支持中文的字体，按优先级排列
+FONT_PATHS = [
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc',
+    '/usr/share/fonts/truetype/arphic/uming.ttc',
+    '/System/Library/Fonts/PingFang.ttc',  # macOS
+]
+
+# 进程内字体缓存：{(字体路径, 修改时间): 已解析的字体对象}
+# 解析大型CJK字体（cmap、字宽表）很慢，同一进程内每个字体文件只解析一次
+_FONT_CACHE = {}
+
+class SCYSPDF(FPDF):
+    """自定义PDF类，支持中文"""
+    def __init__(self):
+        super().__init__()
+        self.add_page()
+        # 添加支持中文的字体
+        self.font_loaded = False
+        for font_path in FONT_PATHS:
+            try:
+                if os.path.exists(font_path):
+                    self.add_cached_font('Chinese', font_path)
+                    self.set_font('Chinese', '', 12)
+                    self.font_loaded = True
+                    break
+            except Exception as e:
+                print(f"警告：加载字体失败 {font_path}: {e}")
+                continue
+        
+        if not self.font_loaded:
+            print("警告：无法加载中文字体，PDF可能无法正确显示中文")
+            try:
+                self.set_font('Arial', '', 12)
+            except:
+                pass
+    
+    def add_cached_font(self, family, font_path):
+        """添加字体，复用缓存中已解析的字体度量"""
+        key = (font_path, os.path.getmtime(font_path))
+        fontkey = family.lower()
+        template = _FONT_CACHE.get(key)
+        
+        if not template:
+            # 首次加载，或缓存路径在当前fpdf2版本上不可用（False）
+            self.add_font(family, '', font_path)
+            if template is None:
+                _FONT_CACHE[key] = copy.copy(self.fonts[fontkey])
+            return
+        
+        # 字宽、cmap等只读数据共享；输出时会被子集化修改的部分每个文档单独创建
+        # 这里依赖fpdf2 2.8的内部结构，其他版本上失败时退回到每个文档重新解析字体
+        try:
+            from fontTools import ttLib
+            from fpdf.fonts import SubsetMap
+            
+            font = copy.copy(template)
+            font.i = len(self.fonts) + 1
+            font.ttfont = ttLib.TTFont(
+                font_path, recalcTimestamp=False, lazy=True,
+                fontNumber=getattr(template, 'collection_font_number', 0)
+            )
+            font.subset = SubsetMap(font)
+            font.missing_glyphs = []
+            font.biggest_size_pt = 0
+        except Exception as e:
+            print(f"警告：当前fpdf2版本不支持字体缓存（{e}），每个文档重新解析字体")
+            _FONT_CACHE[key] = False
+            self.add_font(family, '', font_path)
+            return
+        self.fonts[fontkey] = font
+
+def render_text_pdf(article_data):
+    """用fpdf排版文章，返回PDF字节（由调用方决定何时写盘），失败时抛出异常"""
+    pdf = SCYSPDF()
+    
+    # 添加标题
+    pdf.set_font_size(16)
+    pdf.multi_cell(0, 10, article_data['title'])
+    pdf.ln(5)
+    
+    # 添加内容
+    pdf.set_font_size(12)
+    
+    # 处理内容，避免特殊字符问题
+    for line in article_data['content'].split('\n'):
+        if line.strip():
+            try:
+                # fpdf2 的 multi_cell 结束后光标停在右边距，每行先回到左边距
+                pdf.set_x(pdf.l_margin)
+                pdf.multi_cell(0, 8, line)
+            except Exception as e:
+                # 如果某行有问题，跳过
+                print(f"警告：跳过有问题的行: {e}")
+                continue
+    
+    return bytes(pdf.output())
+
+
+def write_pdf_bytes(data, output_path):
+    """先写同目录下的临时文件再原子重命名，中途被杀不会留下截断的PDF"""
+    f, tmp_path = temp_file_for(output_path)
+    try:
+        with f:
+            f.write(data)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_text_pdf(article_data, output_path):
+    """用fpdf排版文章并写入output_path，失败时抛出异常"""
+    write_pdf_bytes(render_text_pdf(article_data), output_path)
+
+
+def warm_pdf_worker():
+    """进程池初始化：预先解析一次中文字体，之后该进程内的SCYSPDF都复用缓存"""
+    SCYSPDF()
+
+
+def start_pdf_pool(workers):
+    """创建排版进程池并立即启动工作进程
+
+    fork方式下必须在启动任何线程（如写盘线程）之前调用，带着活动线程fork的子进程可能死锁；
+    进程池在第一次提交任务时才创建进程（fork方式下一次全部创建），这里提交一个空任务触发
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=warm_pdf_worker)
+    pool.submit(os.getpid)
+    return pool
+
+
+def build_pdf_job(article_data):
+    """在进程池中运行，只排版不写盘，返回 (PDF字节或None, 排版耗时, 错误信息)
+
+    写盘由主进程完成（写线程或原子重命名），与其他输出走同一条路径
+    """
+    start = time.perf_counter()
+    try:
+        return render_text_pdf(article_data), time.perf_counter() - start, None
+    except Exception as e:
+        return None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
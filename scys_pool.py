@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+浏览器工作池 - 用多个无头Chrome并行渲染文章
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BrowserPool:
+    """固定大小的worker池，每个worker独占一个浏览器，任务结果按原始顺序返回"""
+
+    def __init__(self, factory, size, destroy=None, should_recycle=None):
+        # factory(index) 返回一个已就绪的worker，destroy(worker) 负责释放资源
+        # should_recycle(worker) 在每个任务结束后调用，返回True时用新worker替换（控制内存增长）
+        self.factory = factory
+        self.destroy = destroy
+        self.should_recycle = should_recycle
+        self.size = max(1, int(size))
+        self.workers = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """并行启动所有worker，部分失败时使用剩余的worker继续"""
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [executor.submit(self.factory, i) for i in range(self.size)]
+
+        for i, future in enumerate(futures, 1):
+            try:
+                worker = future.result()
+            except Exception as e:
+                print(f"worker {i} 启动失败: {e}")
+                continue
+            self.workers.append(worker)
+            self._idle.put(worker)
+
+        if not self.workers:
+            raise RuntimeError("没有可用的浏览器worker")
+
+        print(f"✓ 已启动 {len(self.workers)} 个浏览器worker")
+        return self
+
+    def map(self, fn, items):
+        """对每个item执行 fn(worker, item)，返回与items顺序一致的结果列表"""
+        def task(item):
+            worker = self._idle.get()
+            try:
+                return fn(worker, item)
+            finally:
+                self._idle.put(self._maybe_recycle(worker))
+
+        with ThreadPoolExecutor(max_workers=len(self.workers)) as executor:
+            return list(executor.map(task, items))
+
+    def _maybe_recycle(self, worker):
+        """需要时先创建新worker再销毁旧的，新worker启动失败则继续使用旧的"""
+        try:
+            if not (self.should_recycle and self.should_recycle(worker)):
+                return worker
+        except Exception:
+            return worker
+        with self._lock:
+            index = self.workers.index(worker)
+        try:
+            replacement = self.factory(index)
+        except Exception as e:
+            print(f"worker {index + 1} 回收失败，继续使用原worker: {e}")
+            return worker
+        try:
+            if self.destroy:
+                self.destroy(worker)
+        except Exception:
+            pass
+        with self._lock:
+            self.workers[index] = replacement
+        print(f"♻ worker {index + 1} 已回收重建")
+        return replacement
+
+    def close(self):
+        """关闭所有worker"""
+        for worker in self.workers:
+            try:
+                if self.destroy:
+                    self.destroy(worker)
+            except Exception:
+                pass
+        self.workers = []
+        self._idle = queue.Queue()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
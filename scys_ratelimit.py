@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+自适应限速 - 令牌桶 + AIMD 并发控制，代替固定的 time.sleep(2)
+
+- 令牌桶控制每秒请求数（不超过 max_rps）
+- 并发上限在 1 ~ max_concurrency 之间自适应
+- 响应正常时加性增加速率和并发；遇到 429/5xx、加载过慢、
+  跳转到验证码/登录页时乘性减少，并遵守 Retry-After
+
+Selenium 和 HTTP 两条通道共用同一个限速器实例。
+"""
+import time
+import threading
+from contextlib import contextmanager
+
+# 出现在最终URL中表示被拦截（验证码或掉登录）
+BLOCKED_URL_MARKERS = ('captcha', 'verify', 'login', 'passport')
+
+
+class _Slot:
+    """一次请求的反馈信息"""
+
+    def __init__(self):
+        self.status = None
+        self.url = None
+        self.slow = False
+        self.retry_after = None
+
+    def report(self, status=None, url=None, slow=False, retry_after=None):
+        self.status = status
+        self.url = url
+        self.slow = slow
+        self.retry_after = retry_after
+
+
+class AdaptiveRateLimiter:
+    """线程安全的自适应限速器"""
+
+    def __init__(self, max_rps=1.0, max_concurrency=4, min_rps=0.1,
+                 slow_threshold=10.0, increase_step=0.05, decrease_factor=0.5):
+        self.max_rps = max_rps
+        self.min_rps = min_rps
+        self.max_concurrency = max(1, max_concurrency)
+        self.slow_threshold = slow_threshold    # 超过该秒数视为服务端变慢
+        self.increase_step = increase_step      # 每次成功增加的速率（请求/秒）
+        self.decrease_factor = decrease_factor  # 每次失败后速率和并发的乘数
+
+        # 从一半速率、单并发开始探测
+        self.rate = max(min_rps, max_rps / 2)
+        self.concurrency = 1
+
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._inflight = 0
+        self._successes = 0
+        self._blocked_until = 0.0
+        self._cond = threading.Condition()
+
+        self.stats = {'requests': 0, 'throttled': 0}
+
+    def resize(self, max_concurrency):
+        """调整并发上限（例如浏览器worker数确定之后），只放宽不收紧"""
+        with self._cond:
+            self.max_concurrency = max(self.max_concurrency, max_concurrency)
+            self._cond.notify_all()
+
+    def _refill(self, now):
+        capacity = max(1.0, self.rate)
+        self._tokens = min(capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """阻塞直到拿到令牌和并发名额"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._inflight >= self.concurrency:
+                    wait = None  # 等待其他请求释放
+                elif self._tokens < 1.0:
+                    wait = (1.0 - self._tokens) / self.rate
+                else:
+                    self._tokens -= 1.0
+                    self._inflight += 1
+                    self.stats['requests'] += 1
+                    return
+                self._cond.wait(wait)
+
+    def release(self, ok=True, retry_after=None):
+        """释放名额并根据结果调整速率（AIMD）"""
+        with self._cond:
+            self._inflight = max(0, self._inflight - 1)
+            if ok:
+                self.rate = min(self.max_rps, self.rate + self.increase_step)
+                self._successes += 1
+                if self._successes >= self.concurrency:
+                    self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+                    self._successes = 0
+            else:
+                self.stats['throttled'] += 1
+                self.rate = max(self.min_rps, self.rate * self.decrease_factor)
+                self.concurrency = max(1, int(self.concurrency * self.decrease_factor))
+                self._successes = 0
+                self._tokens = min(self._tokens, 0.0)
+                if retry_after:
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            self._cond.notify_all()
+
+    def is_healthy(self, slot, elapsed):
+        """判断一次请求是否说明服务端状态良好"""
+        if slot.status is not None and (slot.status == 429 or slot.status >= 500):
+            return False
+        if slot.slow or elapsed > self.slow_threshold:
+            return False
+        if slot.url and any(marker in slot.url.lower() for marker in BLOCKED_URL_MARKERS):
+            return False
+        return True
+
+    @contextmanager
+    def slot(self):
+        """with limiter.slot() as slot: ... slot.report(status=..., url=...)"""
+        self.acquire()
+        slot = _Slot()
+        start = time.monotonic()
+        try:
+            yield slot
+        except BaseException:
+            self.release(ok=False)
+            raise
+        self.release(ok=self.is_healthy(slot, time.monotonic() - start), retry_after=slot.retry_after)
+
+
+def parse_retry_after(value):
+    """解析 Retry-After 头（只支持秒数）"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+@contextmanager
+def limited(limiter):
+    """limiter为None时不限速，调用方代码无需区分"""
+    if limiter is None:
+        yield _Slot()
+    else:
+        with limiter.slot() as slot:
+            yield slot
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+页面就绪检测 - 用真实信号代替固定的 time.sleep
+
+就绪条件（全部满足才算加载完成）：
+  1. document.readyState == 'complete'
+  2. 网络空闲：通过 Chrome performance 日志中的 CDP Network.* 事件统计未完成的请求
+  3. 所有非懒加载图片的 complete 为 true
+  4. DOM 在 quiet_period 内没有新的变化（MutationObserver）
+
+每个页面有一个总的超时预算，从 reset() 开始计时，同一页面上的多次 wait() 共享该预算。
+"""
+import json
+import time
+
+# 在页面中安装 MutationObserver，并一次性返回所有就绪信号
+READY_STATE_JS = """
+if (!window.__scysMutation) {
+    window.__scysMutation = {last: performance.now()};
+    try {
+        new MutationObserver(function () {
+            window.__scysMutation.last = performance.now();
+        }).observe(document.documentElement, {
+            childList: true, subtree: true, attributes: true, characterData: true
+        });
+    } catch (e) {}
+}
+var pending = 0;
+for (var i = 0; i < document.images.length; i++) {
+    var img = document.images[i];
+    if (!img.complete && img.loading !== 'lazy') pending++;
+}
+return {
+    readyState: document.readyState,
+    imagesPending: pending,
+    quietMs: performance.now() - window.__scysMutation.last
+};
+"""
+
+NETWORK_START_EVENTS = ('Network.requestWillBeSent',)
+NETWORK_END_EVENTS = ('Network.loadingFinished', 'Network.loadingFailed')
+
+
+def enable_network_tracking(chrome_options):
+    """开启Chrome performance日志，使 Network.* 事件可以通过 driver.get_log 读取"""
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+class PageReadiness:
+    """基于 readyState / 网络空闲 / 图片 / DOM静默 的页面就绪等待器"""
+
+    def __init__(self, driver, timeout=15, quiet_period=0.5, network_idle=0.5,
+                 max_inflight=2, poll_interval=0.1):
+        self.driver = driver
+        self.timeout = timeout              # 每个页面的总超时预算（秒）
+        self.quiet_period = quiet_period    # DOM无变化的时长（秒）
+        self.network_idle = network_idle    # 网络空闲需要持续的时长（秒）
+        self.max_inflight = max_inflight    # 允许的常驻请求数（长轮询、统计脚本等）
+        self.poll_interval = poll_interval
+
+        self._inflight = set()
+        self._idle_since = None
+        self._deadline = None
+        self._network_available = True
+        self.last_wait = 0.0
+        self.document_status = None  # 主文档的HTTP状态码（来自 Network.responseReceived）
+        self.requests = 0            # 当前页面发出的请求数
+        self.bytes_received = 0      # 当前页面接收的字节数（encodedDataLength）
+        self.blocked = {}            # 当前页面被资源策略拦截的请求数，按资源类型统计
+
+    def reset(self):
+        """开始一个新页面：清空旧的网络事件并重新计算超时预算"""
+        self._inflight.clear()
+        self._idle_since = None
+        self.document_status = None
+        self.requests = 0
+        self.bytes_received = 0
+        self.blocked = {}
+        self._deadline = time.monotonic() + self.timeout
+        self._drain_network_events()
+
+    def _drain_network_events(self):
+        """读取performance日志，更新未完成请求集合"""
+        if not self._network_available:
+            return
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception:
+            # 未开启performance日志时只依赖其余信号
+            self._network_available = False
+            return
+
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError, TypeError):
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+            request_id = params.get('requestId')
+            if not request_id:
+                continue
+            if (method == 'Network.responseReceived' and params.get('type') == 'Document'
+                    and self.document_status is None):
+                self.document_status = params.get('response', {}).get('status')
+            if method in NETWORK_START_EVENTS:
+                self._inflight.add(request_id)
+                self.requests += 1
+            elif method in NETWORK_END_EVENTS:
+                self._inflight.discard(request_id)
+                self.bytes_received += params.get('encodedDataLength', 0) or 0
+                if params.get('blockedReason') == 'inspector':
+                    # 被 Network.setBlockedURLs 拦截
+                    resource_type = params.get('type', 'Other')
+                    self.blocked[resource_type] = self.blocked.get(resource_type, 0) + 1
+
+    def document_response(self):
+        """读取已到达的网络事件，返回主文档的HTTP状态码（还没有响应时为None）"""
+        self._drain_network_events()
+        return self.document_status
+
+    def _network_is_idle(self, now):
+        self._drain_network_events()
+        if not self._network_available:
+            return True
+        if len(self._inflight) > self.max_inflight:
+            self._idle_since = None
+            return False
+        if self._idle_since is None:
+            self._idle_since = now
+        return now - self._idle_since >= self.network_idle
+
+    def check(self):
+        """检查一次所有就绪信号，返回 (是否就绪, 状态字典)"""
+        now = time.monotonic()
+        try:
+            state = self.driver.execute_script(READY_STATE_JS) or {}
+        except Exception:
+            # 页面正在跳转时脚本可能执行失败
+            return False, {}
+
+        ready = (
+            state.get('readyState') == 'complete'
+            and state.get('imagesPending', 0) == 0
+            and state.get('quietMs', 0) >= self.quiet_period * 1000
+        )
+        # 网络检测放在最后，保证事件被持续消费
+        network_idle = self._network_is_idle(now)
+        state['inflight'] = len(self._inflight)
+        return ready and network_idle, state
+
+    def wait(self):
+        """等待页面就绪，超出预算时返回False（不抛异常，由调用方决定是否继续）"""
+        if self._deadline is None:
+            self.reset()
+
+        start = time.monotonic()
+        state = {}
+        while True:
+            ready, state = self.check()
+            if ready:
+                self.last_wait = time.monotonic() - start
+                return True
+            if time.monotonic() >= self._deadline:
+                self.last_wait = time.monotonic() - start
+                print(f"⚠ 页面就绪等待超时，继续处理 (状态: {state})")
+                return False
+            time.sleep(self.poll_interval)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+本地全文索引 - 不打开PDF就能按关键词查找已归档的文章
+
+抓取时把每篇文章的标题、URL、正文和元数据增量写入输出目录下的 SQLite FTS5 索引
+（scys_pdfs/search.sqlite3）；内容哈希未变化的文章只更新元数据，不重新分词。
+
+FTS5 自带的 unicode61 分词器按空白和标点切词，整段中文会被当成一个词，搜不到其中的词语。
+这里在写入前把连续的中日韩字符切成重叠的二元组（"副业赚钱" → 副业 业赚 赚钱 钱），
+查询时按同样方式切分并作为短语匹配，任意长度的中文词都能命中；英文和数字仍由 unicode61 处理。
+
+用法：
+    python3 scys_search.py 副业 赚钱
+    python3 scys_search.py "私域流量" --limit 5 --output-dir scys_pdfs
+"""
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+from scys_manifest import canonical_url, content_hash
+
+INDEX_FILENAME = "search.sqlite3"
+
+# 中日韩统一表意文字、扩展A、兼容表意文字、假名、谚文
+CJK_RUN = re.compile(r'[぀-ヿ㐀-䶿一-鿿豈-﫿가-힯]+')
+
+SNIPPET_CHARS = 60
+
+
+def segment(text):
+    """写入索引前的分词：每段连续CJK字符替换为重叠二元组加最后一个字，其余文本保持不变"""
+    def bigrams(match):
+        run = match.group(0)
+        grams = [run[i:i + 2] for i in range(len(run) - 1)]
+        grams.append(run[-1])
+        return ' ' + ' '.join(grams) + ' '
+    return CJK_RUN.sub(bigrams, text or '')
+
+
+def _term_tokens(term):
+    """查询词 → 按索引顺序排列的词元（CJK只取二元组，单字除外）"""
+    tokens = []
+    position = 0
+    for match in CJK_RUN.finditer(term):
+        tokens.extend(re.findall(r'\w+', term[position:match.start()]))
+        run = match.group(0)
+        tokens.extend([run[i:i + 2] for i in range(len(run) - 1)] or [run])
+        position = match.end()
+    tokens.extend(re.findall(r'\w+', term[position:]))
+    return tokens
+
+
+def build_query(text):
+    """用户输入 → FTS5 MATCH 表达式；空格分隔的多个词需要同时命中，单个汉字按前缀匹配"""
+    clauses = []
+    for term in text.split():
+        tokens = _term_tokens(term)
+        if not tokens:
+            continue
+        phrase = '"' + ' '.join(token.replace('"', '""') for token in tokens) + '"'
+        if len(tokens) == 1 and CJK_RUN.fullmatch(tokens[0]) and len(tokens[0]) == 1:
+            phrase += '*'
+        clauses.append(phrase)
+    return ' AND '.join(clauses)
+
+
+def make_snippet(text, terms, width=SNIPPET_CHARS):
+    """在原文中找到第一个命中的词，截取前后各width个字符并用【】标出"""
+    text = ' '.join((text or '').split())
+    lowered = text.lower()
+    hits = [(lowered.find(term.lower()), term) for term in terms if term]
+    hits = [(pos, term) for pos, term in hits if pos >= 0]
+    if not hits:
+        return text[:width * 2] + ('…' if len(text) > width * 2 else '')
+    pos, term = min(hits)
+    start = max(0, pos - width)
+    end = min(len(text), pos + len(term) + width)
+    return ('…' if start else '') + text[start:pos] + '【' + text[pos:pos + len(term)] + '】' + \
+        text[pos + len(term):end] + ('…' if end < len(text) else '')
+
+
+class SearchIndex:
+    """已归档文章的全文索引，多个worker线程可以共用"""
+
+    def __init__(self, output_dir, filename=INDEX_FILENAME):
+        self.path = os.path.join(output_dir, filename)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                url TEXT UNIQUE,
+                title TEXT,
+                content TEXT,
+                meta TEXT,
+                output_path TEXT,
+                content_hash TEXT,
+                indexed_at REAL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                title, content, tokenize = 'unicode61 remove_diacritics 2'
+            );
+        """)
+        self.conn.commit()
+
+    def add(self, url, title, content, output_path=None, meta=None):
+        """写入或更新一篇文章，返回True表示重新分词（新文章或内容有变化）"""
+        key = canonical_url(url)
+        new_hash = content_hash(f"{title}\n{content}")
+        meta_json = json.dumps(meta or {}, ensure_ascii=False)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT id, content_hash FROM documents WHERE url = ?", (key,)
+            ).fetchone()
+            if row and row['content_hash'] == new_hash:
+                self.conn.execute(
+                    "UPDATE documents SET output_path = COALESCE(?, output_path), meta = ?, indexed_at = ? "
+                    "WHERE id = ?", (output_path, meta_json, time.time(), row['id'])
+                )
+                self.conn.commit()
+                return False
+            if row:
+                self.conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (row['id'],))
+            cursor = self.conn.execute("""
+                INSERT INTO documents (url, title, content, meta, output_path, content_hash, indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    title = excluded.title,
+                    content = excluded.content,
+                    meta = excluded.meta,
+                    output_path = COALESCE(excluded.output_path, documents.output_path),
+                    content_hash = excluded.content_hash,
+                    indexed_at = excluded.indexed_at
+            """, (key, title, content, meta_json, output_path, new_hash, time.time()))
+            doc_id = row['id'] if row else cursor.lastrowid
+            self.conn.execute(
+                "INSERT INTO documents_fts (rowid, title, content) VALUES (?, ?, ?)",
+                (doc_id, segment(title), segment(content))
+            )
+            self.conn.commit()
+            return True
+
+    def search(self, text, limit=20):
+        """按关键词查询，标题命中的权重更高，返回按相关度排序的结果列表"""
+        query = build_query(text)
+        if not query:
+            return []
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT d.url, d.title, d.content, d.meta, d.output_path, d.indexed_at,
+                       bm25(documents_fts, 10.0, 1.0) AS score
+                FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+                WHERE documents_fts MATCH ?
+                ORDER BY score
+                LIMIT ?
+            """, (query, limit)).fetchall()
+        terms = text.split()
+        return [{
+            'url': row['url'],
+            'title': row['title'],
+            'output_path': row['output_path'],
+            'meta': json.loads(row['meta'] or '{}'),
+            'indexed_at': row['indexed_at'],
+            'score': round(-row['score'], 3),
+            'snippet': make_snippet(row['content'], terms),
+        } for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="在已归档文章的全文索引中查找")
+    parser.add_argument('query', nargs='+', help="关键词，多个词需要同时命中")
+    parser.add_argument('--output-dir', default='scys_pdfs', help="归档输出目录")
+    parser.add_argument('--limit', type=int, default=20, help="最多显示多少条结果")
+    parser.add_argument('--json', action='store_true', help="以JSON输出结果")
+    args = parser.parse_args(argv)
+
+    path = os.path.join(args.output_dir, INDEX_FILENAME)
+    if not os.path.exists(path):
+        print(f"索引不存在: {path}（先运行一次爬虫）")
+        sys.exit(1)
+
+    index = SearchIndex(args.output_dir)
+    try:
+        start = time.perf_counter()
+        results = index.search(' '.join(args.query), limit=args.limit)
+        elapsed = time.perf_counter() - start
+        total = index.count()
+    finally:
+        index.close()
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    print(f"在 {total} 篇文章中找到 {len(results)} 条结果（{elapsed * 1000:.1f} ms）\n")
+    for i, result in enumerate(results, 1):
+        print(f"{i:>2}. {result['title']}")
+        print(f"    {result['url']}")
+        if result['output_path']:
+            print(f"    文件: {result['output_path']}")
+        print(f"    {result['snippet']}\n")
+
+
+if __name__ == "__main__":
+    main()
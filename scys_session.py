@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+登录状态校验 - 尽量不导航、不传输整页 page_source
+
+  1. 本地检查 scys_cookies.json 中登录相关cookie的过期时间，已过期直接判定失效
+  2. 在TTL内复用上一次的校验结果（记录在cookies文件旁的 .state.json 中，
+     cookies文件变化后自动失效）
+  3. 都无法判断时才做一次探测：HTTP请求一次，或在浏览器中执行一次DOM查询
+
+浏览器恢复登录状态改用 CDP Network.setCookies，在第一次导航之前写入cookies，
+不再需要 get + add_cookie + refresh。
+"""
+import os
+import re
+import json
+import time
+
+# 名称像登录凭证的cookie，过期时间以它们为准
+AUTH_COOKIE_PATTERN = re.compile(r'sess|token|auth|sid|uid|login|jwt|ticket', re.I)
+
+# 一次DOM查询判断是否已登录，与 scys_http.is_logged_in_html 的规则一致
+LOGIN_STATE_JS = """
+var text = document.body ? document.body.innerText : '';
+return !(text.indexOf('登录') !== -1 && text.indexOf('登出') === -1 && text.indexOf('退出') === -1);
+"""
+
+
+class SessionExpired(RuntimeError):
+    """浏览器被重定向到登录页，重试无意义，需要重新登录后再运行"""
+
+
+def load_cookie_file(path):
+    """读取Selenium get_cookies格式的cookies文件，不存在或格式错误时返回None"""
+    try:
+        with open(path, 'r') as f:
+            cookies = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cookies if isinstance(cookies, list) else None
+
+
+def cookie_expiry(cookies, now=None):
+    """返回 (是否未过期, 最早过期时间)
+
+    有登录相关cookie时只看它们，否则看全部cookie；
+    没有 expiry 字段的会话cookie视为未过期（由探测来判断服务端是否仍认可）
+    """
+    now = time.time() if now is None else now
+    auth = [c for c in cookies if AUTH_COOKIE_PATTERN.search(c.get('name', ''))]
+    expiries = [c['expiry'] for c in (auth or cookies) if c.get('expiry')]
+    if not expiries:
+        return True, None
+    earliest = min(expiries)
+    if auth:
+        # 任一登录凭证过期即失效
+        return earliest > now, earliest
+    # 无法识别凭证时，全部过期才算失效
+    return max(expiries) > now, earliest
+
+
+def to_cdp_cookies(cookies, base_url):
+    """转换为 Network.setCookies 的参数格式"""
+    result = []
+    for cookie in cookies:
+        item = {
+            'name': cookie['name'],
+            'value': cookie['value'],
+            'path': cookie.get('path', '/'),
+            'secure': bool(cookie.get('secure', False)),
+            'httpOnly': bool(cookie.get('httpOnly', False)),
+        }
+        if cookie.get('domain'):
+            item['domain'] = cookie['domain']
+        else:
+            item['url'] = base_url
+        if cookie.get('sameSite') in ('Strict', 'Lax', 'None'):
+            item['sameSite'] = cookie['sameSite']
+        if cookie.get('expiry'):
+            item['expires'] = cookie['expiry']
+        result.append(item)
+    return result
+
+
+def inject_cookies(driver, cookies, base_url):
+    """在导航之前通过CDP写入cookies，成功返回True"""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': to_cdp_cookies(cookies, base_url)})
+        return True
+    except Exception as e:
+        print(f"通过CDP写入cookies失败: {e}")
+        return False
+
+
+def dom_logged_in(driver):
+    """在当前页面执行一次DOM查询判断是否已登录"""
+    try:
+        return bool(driver.execute_script(LOGIN_STATE_JS))
+    except Exception:
+        return False
+
+
+class SessionValidator:
+    """带TTL缓存的登录状态校验器"""
+
+    def __init__(self, cookies_file, ttl=600):
+        self.cookies_file = cookies_file
+        self.ttl = ttl  # 校验结果的有效期（秒），0表示不缓存
+        self.state_file = os.path.splitext(cookies_file)[0] + '.state.json'
+
+    def _fingerprint(self):
+        try:
+            stat = os.stat(self.cookies_file)
+        except OSError:
+            return None
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def check_local(self):
+        """只读本地cookies文件，返回 (是否可能有效, 原因)"""
+        cookies = load_cookie_file(self.cookies_file)
+        if not cookies:
+            return False, '没有保存的cookies'
+        valid, earliest = cookie_expiry(cookies)
+        if not valid:
+            expired_at = time.strftime('%Y-%m-%d %H:%M', time.localtime(earliest))
+            return False, f"cookies已于 {expired_at} 过期"
+        return True, None
+
+    def cached(self):
+        """TTL内的上一次校验结果，没有时返回None"""
+        if self.ttl <= 0:
+            return None
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('fingerprint') != self._fingerprint():
+            return None
+        if time.time() - state.get('checked_at', 0) > self.ttl:
+            return None
+        return state.get('valid')
+
+    def record(self, valid):
+        """记录一次校验结果"""
+        if self.ttl <= 0:
+            return
+        try:
+            with open(self.state_file, 'w') as f:
+                json.dump({
+                    'fingerprint': self._fingerprint(),
+                    'checked_at': time.time(),
+                    'valid': bool(valid),
+                }, f)
+        except OSError:
+            pass
+
+    def invalidate(self):
+        """丢弃缓存的校验结果（例如HTTP请求被重定向到登录页）"""
+        try:
+            os.remove(self.state_file)
+        except OSError:
+            pass
+
+    def validate(self, probe=None):
+        """返回 True/False；本地和缓存都无法判断且没有probe时返回None
+
+        probe() 执行一次探测（HTTP请求或DOM查询），结果写入缓存
+        """
+        ok, reason = self.check_local()
+        if not ok:
+            print(f"登录状态无效: {reason}")
+            return False
+        state = self.cached()
+        if state is not None:
+            return state
+        if probe is None:
+            return None
+        valid = bool(probe())
+        self.record(valid)
+        return valid